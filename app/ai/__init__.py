@@ -1,3 +1,5 @@
+import threading
+
 from app.ai.computer_vision import ImageAnalyzer
 from app.ai.llm_parser import JobParser
 from app.ai.pricing_agent import DynamicPricingAgent
@@ -9,12 +11,22 @@ _job_parser = None
 _pricing_agent = None
 _ocr_processor = None
 
+# One lock per singleton so a slow ResNet50 load doesn't block the others
+_locks = {
+    "image": threading.Lock(),
+    "parser": threading.Lock(),
+    "pricing": threading.Lock(),
+    "ocr": threading.Lock(),
+}
+
 
 def get_image_analyzer() -> ImageAnalyzer:
     """Get or create ImageAnalyzer singleton"""
     global _image_analyzer
     if _image_analyzer is None:
-        _image_analyzer = ImageAnalyzer()
+        with _locks["image"]:
+            if _image_analyzer is None:
+                _image_analyzer = ImageAnalyzer()
     return _image_analyzer
 
 
@@ -22,7 +34,9 @@ def get_job_parser() -> JobParser:
     """Get or create JobParser singleton"""
     global _job_parser
     if _job_parser is None:
-        _job_parser = JobParser()
+        with _locks["parser"]:
+            if _job_parser is None:
+                _job_parser = JobParser()
     return _job_parser
 
 
@@ -30,7 +44,9 @@ def get_pricing_agent() -> DynamicPricingAgent:
     """Get or create DynamicPricingAgent singleton"""
     global _pricing_agent
     if _pricing_agent is None:
-        _pricing_agent = DynamicPricingAgent()
+        with _locks["pricing"]:
+            if _pricing_agent is None:
+                _pricing_agent = DynamicPricingAgent()
     return _pricing_agent
 
 
@@ -38,7 +54,9 @@ def get_ocr_processor() -> OCRProcessor:
     """Get or create OCRProcessor singleton"""
     global _ocr_processor
     if _ocr_processor is None:
-        _ocr_processor = OCRProcessor()
+        with _locks["ocr"]:
+            if _ocr_processor is None:
+                _ocr_processor = OCRProcessor()
     return _ocr_processor
 
 
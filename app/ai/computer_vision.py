@@ -5,8 +5,17 @@ to estimate square footage and severity from uploaded images
 
 NOTE: AI dependencies are optional. If not installed, returns mock data.
 """
-from typing import Dict, Tuple, List
+from typing import Dict, Tuple, List, Optional
+import copy
+import hashlib
 import logging
+import os
+import tempfile
+
+from cachetools import TTLCache
+
+# Keep oneDNN's primitive cache minimal; must be set before torch is imported
+os.environ.setdefault("LRU_CACHE_CAPACITY", "1")
 
 # Try to import AI dependencies (optional)
 try:
@@ -22,40 +31,100 @@ except ImportError:
     logger = logging.getLogger(__name__)
     logger.warning("AI dependencies not installed. Using mock image analysis.")
 
+# ONNX Runtime is optional on top of torch; falls back to eager PyTorch
+try:
+    import onnxruntime as ort
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+from app.ai.image_utils import downscale_long_edge
+from app.config import settings
 from app.models.job import SeverityLevel, JobType
 
 logger = logging.getLogger(__name__)
 
+# HSV thresholds for coverage masks (OpenCV hue range is 0-180)
+if AI_AVAILABLE:
+    SNOW_HSV_LOWER = np.array([0, 0, 200], dtype=np.uint8)
+    SNOW_HSV_UPPER = np.array([180, 30, 255], dtype=np.uint8)
+    GRASS_HSV_LOWER = np.array([35, 40, 40], dtype=np.uint8)
+    GRASS_HSV_UPPER = np.array([85, 255, 255], dtype=np.uint8)
+
 
 class ImageAnalyzer:
     """
     Computer Vision analyzer for estimating work size and severity
     Uses transfer learning with ResNet50 as feature extractor
+    
+    The current heuristics don't consume the ResNet50 features, so the model
+    is only loaded when CV_EXTRACT_FEATURES is enabled (e.g. once a trained
+    regression head is wired in). The singleton then keeps the model weights resident; intermediate tensors are
+    not retained, and cached CUDA blocks are released every
+    CV_CUDA_EMPTY_CACHE_EVERY analyses.
     """
     
     def __init__(self):
         """Initialize the model and transformations"""
         self.ai_enabled = AI_AVAILABLE
+        self.features_enabled = self.ai_enabled and settings.CV_EXTRACT_FEATURES
         
-        if self.ai_enabled:
+        if self.features_enabled:
             # Load pre-trained ResNet50
             self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
             logger.info(f"Using device: {self.device}")
             
+            # Bound the CUDA caching allocator so the process can't hoard GPU memory
+            if self.device.type == "cuda" and settings.CV_CUDA_MEMORY_FRACTION:
+                torch.cuda.set_per_process_memory_fraction(settings.CV_CUDA_MEMORY_FRACTION)
+            self._analyses_since_release = 0
+            
+            # Reusable pinned staging buffer and side stream for async H2D copies
+            if self.device.type == "cuda":
+                self._pinned = torch.empty(1, 3, 224, 224, pin_memory=True)
+                self._copy_stream = torch.cuda.Stream()
+                self._copy_done = torch.cuda.Event()
+            
             # Load pre-trained model
             self.model = resnet50(weights=ResNet50_Weights.IMAGENET1K_V2)
             self.model = self.model.to(self.device)
             self.model.eval()
             
+            # Fused ONNX Runtime / TensorRT session when available
+            self.ort_session = self._load_onnx_session()
+            
+            # Half precision on GPU engages tensor cores and halves weight memory;
+            # CPU stays FP32 and optionally autocasts to bfloat16 (AMX)
+            self.dtype = torch.float32
+            if self.device.type == "cuda" and self.ort_session is None:
+                self.dtype = torch.float16
+                self.model = self.model.half()
+            self.cpu_bf16 = self.device.type == "cpu" and settings.CV_CPU_BF16
+            
+            # Freeze the eager model into a TorchScript graph (autocast is
+            # resolved at trace time, so skip it when bfloat16 is enabled)
+            if self.ort_session is None and not self.cpu_bf16:
+                self.model = self._trace_model()
+            
             # Image preprocessing
             self.transform = transforms.Compose([
                 transforms.Resize((224, 224)),
                 transforms.ToTensor(),
                 transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
             ])
+            
+            self._warm_up()
+        elif self.ai_enabled:
+            logger.info("ResNet50 feature extraction disabled - using image heuristics only")
         else:
             logger.warning("AI model not initialized - AI dependencies not available")
         
+        # Analysis results keyed by image content hash + job type, so re-uploads
+        # and retries of the same photo skip inference
+        self._result_cache = TTLCache(
+            maxsize=settings.CV_CACHE_SIZE, ttl=settings.CV_CACHE_TTL_SECONDS
+        )
+        
         # Scaling factors for square footage estimation (simplified heuristic)
         # In production, this would be replaced with a fine-tuned model
         self.sqft_scaling_factors = {
@@ -84,47 +153,283 @@ class ImageAnalyzer:
             return self._mock_analysis(job_type)
         
         try:
+            key = self._cache_key(image_path, job_type)
+            cached = self._result_cache.get(key)
+            if cached is not None:
+                return copy.deepcopy(cached)
+            
             # Load and preprocess image
             image = Image.open(image_path).convert('RGB')
-            image_tensor = self.transform(image).unsqueeze(0).to(self.device)
             
             # Extract features using ResNet
-            with torch.no_grad():
-                features = self.model(image_tensor)
+            features = None
+            if self.features_enabled:
+                image_tensor = self._to_device(self.transform(image).unsqueeze(0))
+                features = self._extract_features(image_tensor)
             
-            # Estimate square footage using heuristic
-            # In production: Use a fine-tuned regression head
-            estimated_sqft = self._estimate_square_footage(
-                image_path, features, job_type
-            )
+            result = self._build_result(image_path, image, features, job_type)
+            self._release_cached_memory()
+            # Deep copies: results hold nested dicts/lists callers may mutate
+            self._result_cache[key] = copy.deepcopy(result)
+            return result
             
-            # Estimate severity
-            severity, confidence = self._estimate_severity(
-                image_path, features, job_type
-            )
+        except Exception as e:
+            logger.error(f"Error analyzing image: {e}")
+            raise
+    
+    @staticmethod
+    def _cache_key(image_path: str, job_type: JobType) -> str:
+        """SHA-256 of the image bytes plus job type (hashlib uses OpenSSL's SHA-NI path)"""
+        with open(image_path, "rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+        return f"{digest}:{JobType(job_type).value}"
+    
+    async def analyze_images(
+        self,
+        image_paths: List[str],
+        job_type: JobType,
+        batch_size: Optional[int] = None
+    ) -> List[Dict[str, any]]:
+        """
+        Analyze several images with one ResNet50 forward pass per batch
+        
+        Args:
+            image_paths: Paths to the image files
+            job_type: Type of job (snow removal, lawn care, etc.)
+            batch_size: Images per forward pass (defaults to CV_BATCH_SIZE)
             
-            # Detect key objects/features
-            detected_objects = self._detect_objects(image_path, job_type)
+        Returns:
+            List of analysis results, in the same order as image_paths
+        """
+        if not self.ai_enabled:
+            return [self._mock_analysis(job_type) for _ in image_paths]
+        
+        batch_size = batch_size or settings.CV_BATCH_SIZE
+        results: List[Optional[Dict[str, any]]] = [None] * len(image_paths)
+        
+        try:
+            # Serve cached images from the content cache; only misses go through the model
+            keys = [self._cache_key(path, job_type) for path in image_paths]
+            misses = []
+            for i, key in enumerate(keys):
+                cached = self._result_cache.get(key)
+                if cached is not None:
+                    results[i] = copy.deepcopy(cached)
+                else:
+                    misses.append(i)
+            
+            for start in range(0, len(misses), batch_size):
+                batch_indices = misses[start:start + batch_size]
+                batch_paths = [image_paths[i] for i in batch_indices]
+                images = [Image.open(p).convert('RGB') for p in batch_paths]
+                
+                features = None
+                if self.features_enabled:
+                    # Stack into one (N, 3, 224, 224) tensor; pinned memory lets
+                    # the host-to-device copy run asynchronously
+                    batch = torch.stack([self.transform(img) for img in images])
+                    if self.device.type == "cuda":
+                        batch = batch.pin_memory()
+                    batch = batch.to(self.device, non_blocking=True)
+                    features = self._extract_features(batch)
+                
+                for j, (index, path, image) in enumerate(zip(batch_indices, batch_paths, images)):
+                    image_features = features[j:j + 1] if features is not None else None
+                    result = self._build_result(path, image, image_features, job_type)
+                    self._result_cache[keys[index]] = copy.deepcopy(result)
+                    results[index] = result
+            
+            self._release_cached_memory()
+            return results
             
-            return {
-                "estimated_square_footage": estimated_sqft,
-                "severity": severity,
-                "confidence": confidence,
-                "detected_objects": detected_objects,
-                "metadata": {
-                    "image_dimensions": image.size,
-                    "job_type": job_type.value
-                }
+        except Exception as e:
+            logger.error(f"Error analyzing images: {e}")
+            raise
+    
+    def _build_result(
+        self,
+        image_path: str,
+        image: "Image.Image",
+        features,
+        job_type: JobType
+    ) -> Dict[str, any]:
+        """Run the CV heuristics for one image and assemble its result"""
+        # Decode once and reuse the array across all heuristics. Snow and grass
+        # coverage are pixel fractions, so they are scale-invariant and run on a
+        # downscaled copy; lawn texture variance is not and uses the full image
+        img_rgb = np.asarray(image)
+        img_bgr = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2BGR)
+        img_bgr = downscale_long_edge(img_bgr, settings.IMAGE_MAX_EDGE)
+        
+        # Estimate square footage using heuristic (on the original dimensions)
+        # In production: Use a fine-tuned regression head
+        estimated_sqft = self._estimate_square_footage(
+            image.size, features, job_type
+        )
+        
+        # Estimate severity
+        severity, confidence = self._estimate_severity(
+            img_bgr, img_rgb, features, job_type
+        )
+        
+        # Detect key objects/features
+        detected_objects = self._detect_objects(image_path, job_type)
+        
+        return {
+            "estimated_square_footage": estimated_sqft,
+            "severity": severity,
+            "confidence": confidence,
+            "detected_objects": detected_objects,
+            "metadata": {
+                "image_dimensions": image.size,
+                "job_type": job_type.value
             }
+        }
+    
+    def _load_onnx_session(self):
+        """
+        Export ResNet50 to ONNX once and open an ONNX Runtime session
+        
+        Prefers TensorRT, then CUDA, then CPU execution providers.
+        Returns None (eager PyTorch is used) if ONNX Runtime is unavailable.
+        """
+        onnx_path = settings.CV_ONNX_MODEL_PATH
+        if not ONNX_AVAILABLE or not onnx_path:
+            return None
+        
+        try:
+            if not os.path.exists(onnx_path):
+                self._export_onnx(onnx_path)
             
+            preferred = [
+                "TensorrtExecutionProvider",
+                "CUDAExecutionProvider",
+                "CPUExecutionProvider",
+            ]
+            available = ort.get_available_providers()
+            providers = [p for p in preferred if p in available]
         except Exception as e:
-            logger.error(f"Error analyzing image: {e}")
+            logger.warning(f"ONNX Runtime unavailable, using PyTorch: {e}")
+            return None
+        
+        try:
+            session = ort.InferenceSession(onnx_path, providers=providers)
+        except Exception as e:
+            # Corrupt or stale export; remove it so the next start re-exports
+            logger.warning(f"Failed to load {onnx_path}, removing it and using PyTorch: {e}")
+            try:
+                os.remove(onnx_path)
+            except OSError:
+                pass
+            return None
+        
+        logger.info(f"ONNX Runtime providers: {session.get_providers()}")
+        return session
+    
+    def _export_onnx(self, onnx_path: str):
+        """
+        Export ResNet50 to a temp file beside onnx_path and rename it into place
+        
+        The rename is atomic, so concurrent workers never load a partial file.
+        """
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(onnx_path) or ".", suffix=".onnx.tmp"
+        )
+        os.close(fd)
+        try:
+            dummy_input = torch.randn(1, 3, 224, 224, device=self.device)
+            torch.onnx.export(
+                self.model,
+                dummy_input,
+                tmp_path,
+                input_names=["input"],
+                output_names=["features"],
+                dynamic_axes={"input": {0: "batch"}, "features": {0: "batch"}},
+                opset_version=17
+            )
+            os.replace(tmp_path, onnx_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
             raise
+        logger.info(f"Exported ResNet50 to {onnx_path}")
+    
+    def _to_device(self, image_tensor: "torch.Tensor") -> "torch.Tensor":
+        """
+        Copy a single preprocessed image to the device via the pinned buffer
+        on a side stream, so the transfer overlaps with queued GPU work
+        """
+        if self.device.type != "cuda":
+            return image_tensor
+        
+        # The previous transfer must finish before the staging buffer is reused
+        self._copy_done.synchronize()
+        self._pinned.copy_(image_tensor)
+        
+        with torch.cuda.stream(self._copy_stream):
+            device_tensor = self._pinned.to(self.device, non_blocking=True)
+            self._copy_done.record()
+        
+        compute_stream = torch.cuda.current_stream()
+        compute_stream.wait_stream(self._copy_stream)
+        device_tensor.record_stream(compute_stream)
+        return device_tensor
+    
+    def _warm_up(self):
+        """
+        Run one dummy forward pass so CUDA context creation and cuDNN autotuning
+        happen at startup instead of on the first user request
+        """
+        try:
+            self._extract_features(torch.zeros(1, 3, 224, 224, device=self.device))
+            if self.device.type == "cuda":
+                torch.cuda.synchronize()
+        except Exception as e:
+            logger.warning(f"Model warm-up failed: {e}")
+    
+    def _release_cached_memory(self):
+        """Periodically return cached CUDA blocks to the driver"""
+        if not self.features_enabled or self.device.type != "cuda":
+            return
+        
+        self._analyses_since_release += 1
+        if self._analyses_since_release >= settings.CV_CUDA_EMPTY_CACHE_EVERY:
+            torch.cuda.empty_cache()
+            self._analyses_since_release = 0
+    
+    def _trace_model(self):
+        """Trace and freeze ResNet50, falling back to the eager module on failure"""
+        try:
+            example = torch.randn(1, 3, 224, 224, device=self.device, dtype=self.dtype)
+            with torch.no_grad():
+                traced = torch.jit.trace(self.model, example)
+            return torch.jit.freeze(traced)
+        except Exception as e:
+            logger.warning(f"TorchScript tracing failed, using eager model: {e}")
+            return self.model
+    
+    def _extract_features(self, image_tensor: "torch.Tensor"):
+        """Run the ResNet50 forward pass on ONNX Runtime or PyTorch"""
+        if self.ort_session is not None:
+            np_img = image_tensor.cpu().numpy()
+            return self.ort_session.run(None, {"input": np_img})[0]
+        
+        image_tensor = image_tensor.to(self.dtype)
+        # inference_mode also skips version counters and view tracking
+        with torch.inference_mode(), torch.autocast(
+            device_type="cpu", dtype=torch.bfloat16, enabled=self.cpu_bf16
+        ):
+            features = self.model(image_tensor)
+        
+        # Downstream heuristics expect FP32 statistics
+        return features.float()
     
     def _estimate_square_footage(
         self, 
-        image_path: str, 
-        features: torch.Tensor,
+        image_size: Tuple[int, int], 
+        features: Optional["torch.Tensor"],
         job_type: JobType
     ) -> float:
         """
@@ -133,9 +438,7 @@ class ImageAnalyzer:
         In production, this would be a fine-tuned regression model.
         For MVP, we use heuristics based on image dimensions and feature statistics.
         """
-        # Load image for dimension analysis
-        img = cv2.imread(image_path)
-        height, width = img.shape[:2]
+        width, height = image_size
         
         # Simple heuristic: Use image area as proxy
         # Assuming standard smartphone camera (adjust calibration in production)
@@ -156,24 +459,30 @@ class ImageAnalyzer:
     
     def _estimate_severity(
         self,
-        image_path: str,
-        features: torch.Tensor,
+        img_bgr: np.ndarray,
+        img_rgb: np.ndarray,
+        features: Optional["torch.Tensor"],
         job_type: JobType
     ) -> Tuple[SeverityLevel, float]:
         """
         Estimate severity level from image features
         
+        img_bgr is the downscaled copy used for coverage; img_rgb is the
+        full-resolution image for scale-dependent statistics.
+        
         For snow: light/moderate/heavy based on visible ground
         For lawn: grass height and density
         For handyman: damage extent
         """
-        # Load image for analysis
-        img = cv2.imread(image_path)
-        
         if job_type == JobType.SNOW_REMOVAL:
-            severity, confidence = self._analyze_snow_severity(img)
+            snow_coverage, _, _ = self._compute_masks(img_bgr)
+            severity, confidence = self._analyze_snow_severity(snow_coverage)
         elif job_type == JobType.LAWN_CARE:
-            severity, confidence = self._analyze_lawn_severity(img)
+            _, green_coverage, _ = self._compute_masks(img_bgr)
+            # Laplacian variance is an absolute per-pixel statistic: downscaling
+            # shifts it against the fixed thresholds, so keep full resolution
+            gray = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2GRAY)
+            severity, confidence = self._analyze_lawn_severity(green_coverage, gray)
         else:
             # Default for handyman/other jobs
             severity = SeverityLevel.MODERATE
@@ -181,19 +490,27 @@ class ImageAnalyzer:
         
         return severity, confidence
     
-    def _analyze_snow_severity(self, img: np.ndarray) -> Tuple[SeverityLevel, float]:
-        """Analyze snow coverage and depth"""
-        # Convert to HSV for better snow detection
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+    def _compute_masks(self, img_bgr: np.ndarray) -> Tuple[float, float, np.ndarray]:
+        """
+        Convert to HSV once and derive snow and grass coverage from it
         
-        # Snow is typically high value (brightness) and low saturation
-        # Simple thresholding for MVP
-        lower_white = np.array([0, 0, 200])
-        upper_white = np.array([180, 30, 255])
+        Returns:
+            (snow_coverage, green_coverage, hsv)
+        """
+        # cv2.inRange/countNonZero take the SIMD path on contiguous input and
+        # count the packed uint8 masks without boolean temporaries
+        hsv = np.ascontiguousarray(cv2.cvtColor(img_bgr, cv2.COLOR_BGR2HSV))
         
-        mask = cv2.inRange(hsv, lower_white, upper_white)
-        snow_coverage = np.sum(mask > 0) / mask.size
+        # Snow is typically high value (brightness) and low saturation
+        snow = cv2.inRange(hsv, SNOW_HSV_LOWER, SNOW_HSV_UPPER)
+        # Grass is green hue with some saturation and brightness
+        green = cv2.inRange(hsv, GRASS_HSV_LOWER, GRASS_HSV_UPPER)
         
+        pixels = snow.size
+        return cv2.countNonZero(snow) / pixels, cv2.countNonZero(green) / pixels, hsv
+    
+    def _analyze_snow_severity(self, snow_coverage: float) -> Tuple[SeverityLevel, float]:
+        """Analyze snow coverage and depth"""
         # Classify based on coverage
         if snow_coverage > 0.8:
             return SeverityLevel.SEVERE, 0.85
@@ -204,22 +521,16 @@ class ImageAnalyzer:
         else:
             return SeverityLevel.LIGHT, 0.65
     
-    def _analyze_lawn_severity(self, img: np.ndarray) -> Tuple[SeverityLevel, float]:
+    def _analyze_lawn_severity(
+        self,
+        green_coverage: float,
+        gray: np.ndarray
+    ) -> Tuple[SeverityLevel, float]:
         """Analyze grass height and condition"""
-        # Convert to HSV
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-        
-        # Detect green areas (grass)
-        lower_green = np.array([35, 40, 40])
-        upper_green = np.array([85, 255, 255])
-        
-        mask = cv2.inRange(hsv, lower_green, upper_green)
-        green_coverage = np.sum(mask > 0) / mask.size
-        
         # Analyze texture for grass height (simplified)
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        laplacian = cv2.Laplacian(gray, cv2.CV_64F)
-        texture_variance = laplacian.var()
+        # 16-bit output is exact for 8-bit input with the default 3x3 aperture
+        laplacian = cv2.Laplacian(gray, cv2.CV_16S)
+        texture_variance = float(cv2.meanStdDev(laplacian)[1][0, 0]) ** 2
         
         # Higher variance often indicates taller/denser grass
         if texture_variance > 1000:
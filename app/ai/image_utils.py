@@ -0,0 +1,23 @@
+"""
+Shared image helpers for the CV and OCR pipelines
+"""
+try:
+    import cv2
+    import numpy as np
+except ImportError:
+    pass
+
+
+def downscale_long_edge(img: "np.ndarray", max_edge: int) -> "np.ndarray":
+    """
+    Shrink an image so its longer edge is at most max_edge pixels
+    
+    Phone photos are often 12MP; the OCR and CV heuristics only need a
+    fraction of that, and every filter after this is O(pixels).
+    Images that are already small enough are returned unchanged.
+    """
+    height, width = img.shape[:2]
+    scale = max_edge / max(height, width)
+    if scale >= 1:
+        return img
+    return cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
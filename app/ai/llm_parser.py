@@ -4,10 +4,14 @@ Uses OpenAI GPT-4 to parse natural language into structured job tickets
 
 NOTE: OpenAI dependency is optional. If not available, returns basic parsing.
 """
-from typing import List, Dict
+from typing import List, Dict, Tuple
+import asyncio
 import json
 import logging
 
+import httpx
+from cachetools import TTLCache
+
 try:
     import openai
     OPENAI_AVAILABLE = True
@@ -20,6 +24,83 @@ from app.models.job import JobType
 logger = logging.getLogger(__name__)
 
 
+# Static system prompt for parse_job_request, kept verbatim across calls
+SYSTEM_PROMPT = """You are a helpful assistant that parses home service requests.
+Given a user's description, extract individual job tasks and classify them.
+
+Classify each task into one of these categories:
+- snow_removal: Snow plowing, shoveling, ice removal
+- lawn_care: Mowing, leaf raking, hedge trimming, landscaping
+- handyman: General repairs, furniture assembly, minor fixes
+- plumbing: Pipe repairs, drain issues, faucet installation
+- electrical: Wiring, outlet installation, light fixtures
+- carpentry: Door repair, fence work, deck maintenance
+- other: Tasks that don't fit other categories
+
+Return a JSON array of job objects with these fields:
+- job_type: category from above
+- title: short descriptive title (max 100 chars)
+- description: detailed description of the task
+- priority: "high", "medium", or "low"
+
+If the request is vague, make reasonable assumptions and note them in the description.
+"""
+
+# System prompt for coalesced requests; SYSTEM_PROMPT stays the prefix
+BATCH_SYSTEM_PROMPT = SYSTEM_PROMPT + """
+You will receive a JSON object {"requests": [...]} containing several independent
+service requests. Parse each one separately and return a JSON object
+{"results": [{"jobs": [...]}, ...]} with exactly one entry per request, in the
+same order as the input.
+"""
+
+
+# Structured Outputs schema: the model can only return valid JobType values
+JOB_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "jobs": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "job_type": {"type": "string", "enum": [t.value for t in JobType]},
+                    "title": {"type": "string"},
+                    "description": {"type": "string"},
+                    "priority": {"type": "string", "enum": ["high", "medium", "low"]},
+                },
+                "required": ["job_type", "title", "description", "priority"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["jobs"],
+    "additionalProperties": False,
+}
+
+BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {"type": "array", "items": JOB_SCHEMA},
+    },
+    "required": ["results"],
+    "additionalProperties": False,
+}
+
+
+def _response_format(name: str, schema: Dict) -> Dict:
+    """Build a strict json_schema response_format"""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": name, "strict": True, "schema": schema},
+    }
+
+
+def _cache_key(text: str) -> str:
+    """Normalize free text so trivially different inputs share a cache entry"""
+    return " ".join(text.split()).lower()
+
+
 class JobParser:
     """
     LLM-based parser for converting vague user requests into structured job tickets
@@ -28,11 +109,35 @@ class JobParser:
     def __init__(self):
         """Initialize OpenAI client"""
         self.openai_enabled = OPENAI_AVAILABLE and hasattr(settings, 'OPENAI_API_KEY') and settings.OPENAI_API_KEY
+        self.client = None
         if self.openai_enabled:
-            openai.api_key = settings.OPENAI_API_KEY
+            # One async client with a pooled HTTP/2 transport, so requests reuse
+            # TLS connections and never block the event loop
+            self.client = openai.AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                http_client=httpx.AsyncClient(
+                    http2=True,
+                    limits=httpx.Limits(max_keepalive_connections=50)
+                )
+            )
             self.model = settings.OPENAI_MODEL
         else:
             logger.warning("OpenAI not available - using basic job parsing")
+        
+        # Bounded LRU caches with TTL for LLM responses (low temperature, so
+        # repeated inputs give equivalent answers)
+        self._parse_cache = TTLCache(
+            maxsize=settings.LLM_CACHE_SIZE, ttl=settings.LLM_CACHE_TTL_SECONDS
+        )
+        self._enhance_cache = TTLCache(
+            maxsize=settings.LLM_CACHE_SIZE, ttl=settings.LLM_CACHE_TTL_SECONDS
+        )
+        
+        # Request coalescing state; the worker starts on first use so it is
+        # bound to the running event loop
+        self._batch_queue = None
+        self._batch_worker = None
+        self._batch_tasks = set()
     
     async def parse_job_request(self, user_input: str) -> List[Dict[str, any]]:
         """
@@ -55,65 +160,28 @@ class JobParser:
         if not self.openai_enabled:
             return self._basic_parse(user_input)
         
+        key = _cache_key(user_input)
+        cached = self._parse_cache.get(key)
+        if cached is not None:
+            return [dict(job) for job in cached]
+        
         try:
-            system_prompt = """You are a helpful assistant that parses home service requests.
-Given a user's description, extract individual job tasks and classify them.
-
-Classify each task into one of these categories:
-- snow_removal: Snow plowing, shoveling, ice removal
-- lawn_care: Mowing, leaf raking, hedge trimming, landscaping
-- handyman: General repairs, furniture assembly, minor fixes
-- plumbing: Pipe repairs, drain issues, faucet installation
-- electrical: Wiring, outlet installation, light fixtures
-- carpentry: Door repair, fence work, deck maintenance
-- other: Tasks that don't fit other categories
-
-Return a JSON array of job objects with these fields:
-- job_type: category from above
-- title: short descriptive title (max 100 chars)
-- description: detailed description of the task
-- priority: "high", "medium", or "low"
-
-If the request is vague, make reasonable assumptions and note them in the description.
-"""
-            
-            user_prompt = f"Parse this service request: {user_input}"
-            
-            response = openai.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.3  # Lower temperature for more consistent parsing
-            )
+            # Concurrent calls are coalesced into a single chat completion
+            jobs = await self._submit(user_input)
             
-            content = response.choices[0].message.content
-            parsed_data = json.loads(content)
-            
-            # Extract jobs array from response
-            jobs = parsed_data.get("jobs", [parsed_data]) if "jobs" in parsed_data else [parsed_data]
-            
-            # Validate and normalize job types
-            validated_jobs = []
-            for job in jobs:
-                job_type_str = job.get("job_type", "other").lower()
-                
-                # Map to JobType enum
-                try:
-                    job_type = JobType(job_type_str)
-                except ValueError:
-                    job_type = JobType.OTHER
-                
-                validated_jobs.append({
-                    "job_type": job_type,
-                    "title": job.get("title", "Service Request"),
-                    "description": job.get("description", user_input),
-                    "priority": job.get("priority", "medium")
-                })
+            # The response schema guarantees every field and a valid job_type
+            validated_jobs = [
+                {
+                    "job_type": JobType(job["job_type"]),
+                    "title": job["title"],
+                    "description": job["description"],
+                    "priority": job["priority"]
+                }
+                for job in jobs
+            ]
             
             logger.info(f"Parsed {len(validated_jobs)} jobs from user input")
+            self._parse_cache[key] = [dict(job) for job in validated_jobs]
             return validated_jobs
             
         except Exception as e:
@@ -126,6 +194,126 @@ If the request is vague, make reasonable assumptions and note them in the descri
                 "priority": "medium"
             }]
     
+    async def _submit(self, user_input: str) -> List[Dict[str, any]]:
+        """Queue a request for the batch coalescer and wait for its raw jobs"""
+        loop = asyncio.get_running_loop()
+        if self._batch_worker is None or self._batch_worker.done():
+            self._batch_queue = asyncio.Queue()
+            self._batch_worker = loop.create_task(self._batch_loop())
+        
+        future = loop.create_future()
+        await self._batch_queue.put((user_input, future))
+        return await future
+    
+    async def _batch_loop(self):
+        """
+        Collect queued requests for up to LLM_BATCH_WINDOW_MS (or until
+        LLM_BATCH_MAX_SIZE are waiting) and dispatch them as one batch
+        
+        A lone request (nothing else queued or in flight) is sent at once;
+        the window is only worth waiting when requests are arriving together.
+        """
+        loop = asyncio.get_running_loop()
+        window = settings.LLM_BATCH_WINDOW_MS / 1000
+        
+        while True:
+            batch = [await self._batch_queue.get()]
+            try:
+                if not self._batch_queue.empty() or self._batch_tasks:
+                    deadline = loop.time() + window
+                    while len(batch) < settings.LLM_BATCH_MAX_SIZE:
+                        timeout = deadline - loop.time()
+                        if timeout <= 0:
+                            break
+                        try:
+                            batch.append(await asyncio.wait_for(self._batch_queue.get(), timeout))
+                        except asyncio.TimeoutError:
+                            break
+            except asyncio.CancelledError:
+                self._cancel_futures(batch)
+                raise
+            
+            # Dispatch in the background so the next window can start filling
+            task = loop.create_task(self._dispatch_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+    
+    @staticmethod
+    def _cancel_futures(batch: List[Tuple[str, asyncio.Future]]):
+        """Cancel callers' futures for a batch that will never be sent"""
+        for _, future in batch:
+            if not future.done():
+                future.cancel()
+    
+    async def _dispatch_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Resolve each queued future with the jobs parsed for its input"""
+        inputs = [user_input for user_input, _ in batch]
+        try:
+            if len(inputs) == 1:
+                results = [await self._request_jobs(inputs[0])]
+            else:
+                results = await self._request_jobs_batch(inputs)
+        except asyncio.CancelledError:
+            self._cancel_futures(batch)
+            raise
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), jobs in zip(batch, results):
+            if not future.done():
+                future.set_result(jobs)
+    
+    async def _request_jobs(self, user_input: str) -> List[Dict[str, any]]:
+        """Parse a single request with one chat completion"""
+        # Only the user message varies per call, so the static system prefix
+        # stays byte-identical and eligible for server-side prompt caching
+        user_prompt = f"Parse this service request: {user_input}"
+        
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ],
+            response_format=_response_format("jobs", JOB_SCHEMA),
+            temperature=0.3  # Lower temperature for more consistent parsing
+        )
+        
+        content = response.choices[0].message.content
+        return json.loads(content)["jobs"]
+    
+    async def _request_jobs_batch(self, inputs: List[str]) -> List[List[Dict[str, any]]]:
+        """
+        Parse several requests with one chat completion
+        
+        Falls back to one completion per request if the model does not return
+        exactly one result per input.
+        """
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": json.dumps({"requests": inputs})}
+            ],
+            response_format=_response_format("job_batches", BATCH_SCHEMA),
+            temperature=0.3
+        )
+        
+        content = response.choices[0].message.content
+        results = json.loads(content)["results"]
+        
+        if len(results) != len(inputs):
+            logger.warning(
+                f"Batch parse returned {len(results)} results for {len(inputs)} requests; "
+                "retrying individually"
+            )
+            return list(await asyncio.gather(*(self._request_jobs(i) for i in inputs)))
+        
+        return [result["jobs"] for result in results]
+    
     async def enhance_job_description(self, job_type: JobType, brief_description: str) -> str:
         """
         Use LLM to enhance a brief job description with relevant details
@@ -137,6 +325,14 @@ If the request is vague, make reasonable assumptions and note them in the descri
         Returns:
             Enhanced description with additional context
         """
+        if not self.openai_enabled:
+            return brief_description
+        
+        key = (job_type, _cache_key(brief_description))
+        cached = self._enhance_cache.get(key)
+        if cached is not None:
+            return cached
+        
         try:
             prompt = f"""Given this {job_type.value} job: "{brief_description}"
 
@@ -147,7 +343,7 @@ Enhance the description by:
 
 Return only the enhanced description, no additional commentary."""
             
-            response = openai.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.5,
@@ -155,12 +351,31 @@ Return only the enhanced description, no additional commentary."""
             )
             
             enhanced = response.choices[0].message.content.strip()
+            self._enhance_cache[key] = enhanced
             return enhanced
             
         except Exception as e:
             logger.error(f"Error enhancing description: {e}")
             return brief_description
     
+    async def aclose(self):
+        """Stop the batch worker and in-flight batches, then close the pooled HTTP connections"""
+        pending = list(self._batch_tasks)
+        if self._batch_worker is not None:
+            pending.append(self._batch_worker)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._batch_worker = None
+        
+        # Requests queued but not yet picked up by the worker
+        if self._batch_queue is not None:
+            while not self._batch_queue.empty():
+                self._cancel_futures([self._batch_queue.get_nowait()])
+        
+        if self.client is not None:
+            await self.client.close()
+    
     def _basic_parse(self, user_input: str) -> List[Dict[str, any]]:
         """
         Basic keyword-based parsing when OpenAI is not available
@@ -17,8 +17,89 @@ try:
 except ImportError:
     OCR_AVAILABLE = False
 
+# Aho-Corasick automaton for keyword lookups (optional, falls back to substring checks)
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+from app.ai.image_utils import downscale_long_edge
+from app.config import settings
+
 logger = logging.getLogger(__name__)
 
+# Field patterns, tried in order; the first match wins.
+# Labeled variants share one alternation so the text is scanned once; the
+# unlabeled fallbacks stay separate so a label match always takes priority.
+FIELD_PATTERNS = {
+    "name": [
+        r"(?:FULL\s+NAME|NAME)[:\s]+([A-Z\s]+)",
+        r"([A-Z][a-z]+\s[A-Z][a-z]+)",
+    ],
+    "id_number": [
+        r"(?:ID|DL|LICENSE)[:\s#]+([A-Z0-9]{8,})",
+    ],
+    "license_number": [
+        r"(?:LICENSE|LIC)[:\s#]+([A-Z0-9-]{6,})",
+        r"#\s*([A-Z0-9-]{6,})",
+    ],
+    "address": [
+        r"(\d+\s+[A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln))",
+    ],
+    "policy_number": [
+        r"POLICY[:\s#]+([A-Z0-9-]{6,})",
+    ],
+    "coverage": [
+        r"\$\s*([0-9,]+(?:\.[0-9]{2})?)",
+    ],
+    "cert_number": [
+        r"CERT(?:IFICATE)?[:\s#]+([A-Z0-9-]{6,})",
+    ],
+    "generic_date": [
+        r"\b(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})\b",
+    ],
+}
+
+# Labels passed to _extract_date
+DATE_LABELS = ("DOB", "EXP", "ISSUE", "EFFECTIVE")
+
+# Keyword lists, in priority order when several occur in the same document
+KEYWORDS = {
+    "license_type": ["plumbing", "electrical", "hvac", "general contractor", "carpentry"],
+    "insurance_provider": ["State Farm", "Allstate", "Progressive", "GEICO", "Liberty Mutual"],
+    "cert_type": ["OSHA", "CPR", "First Aid", "Forklift", "Asbestos"],
+}
+
+
+def _build_keyword_automaton():
+    """Build one automaton over every keyword, tagged with its kind"""
+    automaton = ahocorasick.Automaton()
+    for kind, keywords in KEYWORDS.items():
+        for keyword in keywords:
+            automaton.add_word(keyword.lower(), (kind, keyword))
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton() if AHOCORASICK_AVAILABLE else None
+
+# Compiled once at import and shared by every processor
+_FIELD_RES = {
+    field: [re.compile(p, re.IGNORECASE) for p in patterns]
+    for field, patterns in FIELD_PATTERNS.items()
+}
+_DATE_RES = {
+    label: re.compile(
+        label + r"[:\s]+([0-9]{1,2}[/-][0-9]{1,2}[/-][0-9]{2,4})",
+        re.IGNORECASE
+    )
+    for label in DATE_LABELS
+}
+
+# LSTM engine only, assume a single uniform block of text
+TESSERACT_CONFIG = "--oem 1 --psm 6"
+
 
 class OCRProcessor:
     """
@@ -30,6 +111,18 @@ class OCRProcessor:
         self.ocr_enabled = OCR_AVAILABLE
         if not self.ocr_enabled:
             logger.warning("OCR dependencies not available - using mock verification")
+        else:
+            self._warm_up()
+    
+    def _warm_up(self):
+        """
+        OCR a blank image once so the Tesseract binary and its language data
+        are loaded (and in the OS page cache) before the first real document
+        """
+        try:
+            pytesseract.image_to_string(Image.new("L", (32, 32), 255), config=TESSERACT_CONFIG)
+        except Exception as e:
+            logger.warning(f"Tesseract warm-up failed: {e}")
     
     async def process_document(
         self,
@@ -55,7 +148,7 @@ class OCRProcessor:
             processed_image = self._preprocess_image(image_path)
             
             # Extract text using Tesseract
-            text = pytesseract.image_to_string(processed_image)
+            text = pytesseract.image_to_string(processed_image, config=TESSERACT_CONFIG)
             
             # Parse text based on document type
             if document_type == "id":
@@ -76,24 +169,25 @@ class OCRProcessor:
     def _preprocess_image(self, image_path: str) -> Image.Image:
         """
         Preprocess image for better OCR accuracy
+        - Downscale oversized photos
         - Convert to grayscale
-        - Apply thresholding
-        - Denoise
+        - Apply adaptive thresholding (also suppresses background noise)
         """
-        # Read image
+        # Read image; ~1600px on the long edge is plenty for Tesseract
         img = cv2.imread(image_path)
+        img = downscale_long_edge(img, settings.IMAGE_MAX_EDGE)
         
         # Convert to grayscale
         gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         
-        # Apply thresholding to create binary image
-        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        
-        # Denoise
-        denoised = cv2.fastNlMeansDenoising(binary, None, 10, 7, 21)
+        # Local thresholding handles uneven lighting on photographed cards and
+        # is linear in pixel count, unlike non-local means denoising
+        binary = cv2.adaptiveThreshold(
+            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 10
+        )
         
         # Convert back to PIL Image
-        return Image.fromarray(denoised)
+        return Image.fromarray(binary)
     
     def _parse_id_document(self, text: str) -> Dict[str, Optional[str]]:
         """Parse driver's license or ID card"""
@@ -149,127 +243,86 @@ class OCRProcessor:
     
     # Helper methods for extracting specific fields
     
-    def _extract_name(self, text: str) -> Optional[str]:
-        """Extract name from text"""
-        # Look for common patterns
-        patterns = [
-            r"NAME[:\s]+([A-Z\s]+)",
-            r"FULL NAME[:\s]+([A-Z\s]+)",
-            r"([A-Z][a-z]+\s[A-Z][a-z]+)"
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+    def _search_field(self, field: str, text: str) -> Optional[str]:
+        """Return the first capture of the first matching pattern for a field"""
+        for pattern in _FIELD_RES[field]:
+            match = pattern.search(text)
             if match:
                 return match.group(1).strip()
         return None
     
-    def _extract_id_number(self, text: str) -> Optional[str]:
-        """Extract ID number"""
-        patterns = [
-            r"ID[:\s#]+([A-Z0-9]{8,})",
-            r"DL[:\s#]+([A-Z0-9]{8,})",
-            r"LICENSE[:\s#]+([A-Z0-9]{8,})"
-        ]
+    def _match_keyword(self, kind: str, text: str) -> Optional[str]:
+        """Return the highest-priority keyword of a kind found in the text"""
+        keywords = KEYWORDS[kind]
+        text_lower = text.lower()
         
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
+        if _KEYWORD_AUTOMATON is not None:
+            # Single linear scan; then pick by list priority, not text position
+            hits = {
+                keyword
+                for _, (hit_kind, keyword) in _KEYWORD_AUTOMATON.iter(text_lower)
+                if hit_kind == kind
+            }
+            for keyword in keywords:
+                if keyword in hits:
+                    return keyword
+            return None
+        
+        for keyword in keywords:
+            if keyword.lower() in text_lower:
+                return keyword
         return None
     
+    def _extract_name(self, text: str) -> Optional[str]:
+        """Extract name from text"""
+        return self._search_field("name", text)
+    
+    def _extract_id_number(self, text: str) -> Optional[str]:
+        """Extract ID number"""
+        return self._search_field("id_number", text)
+    
     def _extract_license_number(self, text: str) -> Optional[str]:
         """Extract license number"""
-        patterns = [
-            r"LICENSE[:\s#]+([A-Z0-9-]{6,})",
-            r"LIC[:\s#]+([A-Z0-9-]{6,})",
-            r"#\s*([A-Z0-9-]{6,})"
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
-        return None
+        return self._search_field("license_number", text)
     
     def _extract_date(self, text: str, date_type: str) -> Optional[str]:
         """Extract date (DOB, EXP, etc.)"""
         # Look for dates near the specified label
-        pattern = f"{date_type}[:\\s]+([0-9]{{1,2}}[/-][0-9]{{1,2}}[/-][0-9]{{2,4}})"
-        match = re.search(pattern, text, re.IGNORECASE)
+        match = _DATE_RES[date_type].search(text)
         if match:
             return match.group(1).strip()
         
         # Generic date pattern
-        date_pattern = r"\b(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})\b"
-        dates = re.findall(date_pattern, text)
-        if dates:
-            return dates[0]
-        
-        return None
+        return self._search_field("generic_date", text)
     
     def _extract_address(self, text: str) -> Optional[str]:
         """Extract address"""
         # Simple address pattern (can be improved)
-        pattern = r"(\d+\s+[A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln))"
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            return match.group(1).strip()
-        return None
+        return self._search_field("address", text)
     
     def _extract_license_type(self, text: str) -> Optional[str]:
         """Extract license type"""
-        types = ["plumbing", "electrical", "hvac", "general contractor", "carpentry"]
-        text_lower = text.lower()
-        
-        for license_type in types:
-            if license_type in text_lower:
-                return license_type
-        return None
+        return self._match_keyword("license_type", text)
     
     def _extract_policy_number(self, text: str) -> Optional[str]:
         """Extract insurance policy number"""
-        pattern = r"POLICY[:\s#]+([A-Z0-9-]{6,})"
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            return match.group(1).strip()
-        return None
+        return self._search_field("policy_number", text)
     
     def _extract_insurance_provider(self, text: str) -> Optional[str]:
         """Extract insurance provider name"""
-        providers = ["State Farm", "Allstate", "Progressive", "GEICO", "Liberty Mutual"]
-        text_lower = text.lower()
-        
-        for provider in providers:
-            if provider.lower() in text_lower:
-                return provider
-        return None
+        return self._match_keyword("insurance_provider", text)
     
     def _extract_coverage(self, text: str) -> Optional[str]:
         """Extract coverage amount"""
-        pattern = r"\$\s*([0-9,]+(?:\.[0-9]{2})?)"
-        matches = re.findall(pattern, text)
-        if matches:
-            return matches[0]
-        return None
+        return self._search_field("coverage", text)
     
     def _extract_cert_number(self, text: str) -> Optional[str]:
         """Extract certification number"""
-        pattern = r"CERT(?:IFICATE)?[:\s#]+([A-Z0-9-]{6,})"
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            return match.group(1).strip()
-        return None
+        return self._search_field("cert_number", text)
     
     def _extract_cert_type(self, text: str) -> Optional[str]:
         """Extract certification type"""
-        types = ["OSHA", "CPR", "First Aid", "Forklift", "Asbestos"]
-        text_lower = text.lower()
-        
-        for cert_type in types:
-            if cert_type.lower() in text_lower:
-                return cert_type
-        return None
+        return self._match_keyword("cert_type", text)
     
     def _mock_verification(self, document_type: str) -> Dict[str, any]:
         """Return mock verification when OCR is not available"""
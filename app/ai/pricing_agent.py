@@ -5,8 +5,10 @@ Adjusts pricing based on:
 - Real-time weather conditions
 - Local supply/demand (surge pricing)
 """
+import asyncio
 import httpx
 import logging
+from cachetools import TTLCache
 from typing import Dict, Optional
 from datetime import datetime
 import math
@@ -16,6 +18,9 @@ from app.models.job import JobType, SeverityLevel
 
 logger = logging.getLogger(__name__)
 
+# Only these job types have weather-dependent pricing
+WEATHER_SENSITIVE_JOB_TYPES = frozenset({JobType.SNOW_REMOVAL, JobType.LAWN_CARE})
+
 
 class DynamicPricingAgent:
     """
@@ -53,6 +58,47 @@ class DynamicPricingAgent:
             JobType.CARPENTRY: 60.0,
             JobType.OTHER: 40.0,
         }
+        
+        # Hot-path tables, filled for every enum member so lookups need no fallback
+        self._job_rates = {
+            jt: (self.base_rates.get(jt, 50.0), self.minimum_prices.get(jt, 40.0))
+            for jt in JobType
+        }
+        self._severity_table = {sv: self.severity_multipliers.get(sv, 1.0) for sv in SeverityLevel}
+        self._severity_table[None] = 1.0
+        
+        # Surge multiplier indexed by min(provider_count, 10); 10+ providers is optimal
+        self._demand_table = (
+            (settings.SURGE_MULTIPLIER_MAX,)  # No providers available - max surge
+            + (1.8,) * 2
+            + (1.5,) * 2
+            + (1.2,) * 5
+            + (1.0,)
+        )
+        
+        # Weather multipliers by (job_type, OpenWeather "main" condition)
+        self._wx_impact = {
+            (JobType.SNOW_REMOVAL, "snow"): 1.5,  # Heavy snow conditions increase price
+            (JobType.LAWN_CARE, "rain"): 1.2,     # Rain makes lawn care harder
+        }
+        
+        # Long-lived client so weather lookups reuse pooled TCP/TLS connections
+        self._http = httpx.AsyncClient(
+            timeout=5.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            http2=True
+        )
+        
+        # Weather multipliers keyed by (lat, lon rounded to ~1 km, job_type)
+        self._wx_cache = TTLCache(
+            maxsize=settings.WEATHER_CACHE_SIZE, ttl=settings.WEATHER_CACHE_TTL_SECONDS
+        )
+        # One in-flight fetch per cache key; concurrent callers await the same future
+        self._wx_inflight: Dict[tuple, asyncio.Future] = {}
+    
+    async def aclose(self):
+        """Close the pooled HTTP connections"""
+        await self._http.aclose()
     
     async def calculate_price(
         self,
@@ -77,12 +123,13 @@ class DynamicPricingAgent:
         Returns:
             Dictionary with price breakdown
         """
+        base_rate, min_price = self._job_rates[job_type]
+        
         # Calculate base price
-        base_price = self._calculate_base_price(job_type, estimated_sqft)
+        base_price = self._calculate_base_price(job_type, estimated_sqft, base_rate)
         
-        # Apply severity multiplier
-        severity_mult = self.severity_multipliers.get(severity, 1.0) if severity else 1.0
-        price_after_severity = base_price * severity_mult
+        # Get severity multiplier
+        severity_mult = self._severity_table[severity]
         
         # Get weather multiplier
         weather_mult = await self._get_weather_multiplier(latitude, longitude, job_type)
@@ -90,13 +137,9 @@ class DynamicPricingAgent:
         # Get supply/demand multiplier (surge pricing)
         demand_mult = self._calculate_demand_multiplier(provider_count)
         
-        # Calculate final price
+        # Calculate final price, never below the job type's minimum
         total_multiplier = severity_mult * weather_mult * demand_mult
-        final_price = price_after_severity * weather_mult * demand_mult
-        
-        # Apply minimum price
-        min_price = self.minimum_prices.get(job_type, 40.0)
-        final_price = max(final_price, min_price)
+        final_price = max(base_price * total_multiplier, min_price)
         
         # Round to 2 decimal places
         final_price = round(final_price, 2)
@@ -113,10 +156,12 @@ class DynamicPricingAgent:
     def _calculate_base_price(
         self,
         job_type: JobType,
-        estimated_sqft: Optional[float]
+        estimated_sqft: Optional[float],
+        base_rate: Optional[float] = None
     ) -> float:
         """Calculate base price before multipliers"""
-        base_rate = self.base_rates.get(job_type, 50.0)
+        if base_rate is None:
+            base_rate = self._job_rates[job_type][0]
         
         if estimated_sqft and job_type in [JobType.SNOW_REMOVAL, JobType.LAWN_CARE]:
             # Area-based pricing
@@ -135,26 +180,65 @@ class DynamicPricingAgent:
         Get weather-based multiplier using real-time weather API
         Heavy snow = higher prices for snow removal
         """
+        if job_type not in WEATHER_SENSITIVE_JOB_TYPES:
+            return 1.0
+        
         if not latitude or not longitude or not settings.WEATHER_API_KEY:
             return 1.0
         
+        key = (round(latitude, 2), round(longitude, 2), job_type)
+        cached = self._wx_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        inflight = self._wx_inflight.get(key)
+        if inflight is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # The fetching request was cancelled, not us
+                if inflight.cancelled():
+                    return 1.0
+                raise
+        
+        fut = asyncio.get_running_loop().create_future()
+        self._wx_inflight[key] = fut
+        try:
+            multiplier = await self._fetch_weather_multiplier(latitude, longitude, job_type, key)
+        except BaseException:
+            fut.cancel()
+            raise
+        finally:
+            del self._wx_inflight[key]
+        
+        fut.set_result(multiplier)
+        return multiplier
+    
+    async def _fetch_weather_multiplier(
+        self,
+        latitude: float,
+        longitude: float,
+        job_type: JobType,
+        key: tuple
+    ) -> float:
+        """Call the weather API and cache the multiplier on success"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    settings.WEATHER_API_URL,
-                    params={
-                        "lat": latitude,
-                        "lon": longitude,
-                        "appid": settings.WEATHER_API_KEY,
-                        "units": "imperial"
-                    },
-                    timeout=5.0
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    return self._analyze_weather_impact(data, job_type)
-                
+            response = await self._http.get(
+                settings.WEATHER_API_URL,
+                params={
+                    "lat": latitude,
+                    "lon": longitude,
+                    "appid": settings.WEATHER_API_KEY,
+                    "units": "imperial"
+                }
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                multiplier = self._analyze_weather_impact(data, job_type)
+                self._wx_cache[key] = multiplier
+                return multiplier
+            
         except Exception as e:
             logger.warning(f"Weather API error: {e}")
         
@@ -166,19 +250,14 @@ class DynamicPricingAgent:
         main = weather_data.get("main", {})
         
         weather_condition = weather.get("main", "").lower()
-        temperature = main.get("temp", 50)
         
-        if job_type == JobType.SNOW_REMOVAL:
-            # Heavy snow conditions increase price
-            if "snow" in weather_condition:
-                return 1.5
-            elif temperature < 32:  # Freezing
-                return 1.3
+        multiplier = self._wx_impact.get((job_type, weather_condition))
+        if multiplier is not None:
+            return multiplier
         
-        elif job_type == JobType.LAWN_CARE:
-            # Rain makes lawn care harder
-            if "rain" in weather_condition:
-                return 1.2
+        # Freezing temperatures still make snow removal harder
+        if job_type == JobType.SNOW_REMOVAL and main.get("temp", 50) < 32:
+            return 1.3
         
         return 1.0
     
@@ -187,18 +266,7 @@ class DynamicPricingAgent:
         Calculate surge pricing based on supply/demand
         Fewer providers = higher prices (up to 2x)
         """
-        # Optimal provider count is 10+
-        if provider_count >= 10:
-            return 1.0
-        elif provider_count >= 5:
-            return 1.2
-        elif provider_count >= 3:
-            return 1.5
-        elif provider_count >= 1:
-            return 1.8
-        else:
-            # No providers available - max surge
-            return settings.SURGE_MULTIPLIER_MAX
+        return self._demand_table[min(max(provider_count, 0), 10)]
 
 
 # Singleton instance
@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 
 from app.database import get_db
 from app.models.user import User
@@ -22,27 +23,26 @@ async def register_user(
     db: AsyncSession = Depends(get_db)
 ):
     """Register a new user (homeowner)"""
-    # Check if email exists
-    query = select(User).where(User.email == user_data.email)
-    result = await db.execute(query)
-    if result.scalar_one_or_none():
+    # Create user; the unique email index rejects duplicates atomically
+    hashed_password = await AuthService.get_password_hash_async(user_data.password)
+    stmt = (
+        insert(User)
+        .values(
+            email=user_data.email,
+            hashed_password=hashed_password,
+            full_name=user_data.full_name,
+            phone=user_data.phone
+        )
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User)
+    )
+    user = (await db.scalars(stmt)).one_or_none()
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
-    
-    # Create user
-    hashed_password = AuthService.get_password_hash(user_data.password)
-    user = User(
-        email=user_data.email,
-        hashed_password=hashed_password,
-        full_name=user_data.full_name,
-        phone=user_data.phone
-    )
-    
-    db.add(user)
     await db.commit()
-    await db.refresh(user)
     
     # Create access token
     access_token = AuthService.create_access_token(
@@ -62,29 +62,28 @@ async def register_provider(
     db: AsyncSession = Depends(get_db)
 ):
     """Register a new provider (gig worker)"""
-    # Check if email exists
-    query = select(Provider).where(Provider.email == provider_data.email)
-    result = await db.execute(query)
-    if result.scalar_one_or_none():
+    # Create provider; the unique email index rejects duplicates atomically
+    hashed_password = await AuthService.get_password_hash_async(provider_data.password)
+    stmt = (
+        insert(Provider)
+        .values(
+            email=provider_data.email,
+            hashed_password=hashed_password,
+            full_name=provider_data.full_name,
+            phone=provider_data.phone,
+            job_types=provider_data.job_types,
+            hourly_rate=provider_data.hourly_rate
+        )
+        .on_conflict_do_nothing(index_elements=[Provider.email])
+        .returning(Provider)
+    )
+    provider = (await db.scalars(stmt)).one_or_none()
+    if provider is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
-    
-    # Create provider
-    hashed_password = AuthService.get_password_hash(provider_data.password)
-    provider = Provider(
-        email=provider_data.email,
-        hashed_password=hashed_password,
-        full_name=provider_data.full_name,
-        phone=provider_data.phone,
-        job_types=provider_data.job_types,
-        hourly_rate=provider_data.hourly_rate
-    )
-    
-    db.add(provider)
     await db.commit()
-    await db.refresh(provider)
     
     # Create access token
     access_token = AuthService.create_access_token(
@@ -108,7 +107,7 @@ async def login_user(
     result = await db.execute(query)
     user = result.scalar_one_or_none()
     
-    if not user or not AuthService.verify_password(form_data.password, user.hashed_password):
+    if not user or not await AuthService.verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -133,7 +132,7 @@ async def login_provider(
     result = await db.execute(query)
     provider = result.scalar_one_or_none()
     
-    if not provider or not AuthService.verify_password(form_data.password, provider.hashed_password):
+    if not provider or not await AuthService.verify_password_async(form_data.password, provider.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -1,9 +1,10 @@
 """
 Job Routes - Core job creation and management
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+import asyncio
 import logging
 
 from app.database import get_db
@@ -11,18 +12,35 @@ from app.schemas.job import JobCreate, JobResponse, JobAcceptRequest
 from app.services.job_service import JobService, get_job_service
 from app.services.matching_service import MatchingService, get_matching_service
 from app.ai import get_image_analyzer, get_job_parser, get_pricing_agent
+from app.utils.orjson_response import ORJSONResponse
+from app.utils.serializers import job_to_dict
+from app.utils.uploads import save_upload
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def provide_job_service(
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+) -> JobService:
+    """Per-request JobService around the AI services built at startup"""
+    state = request.app.state
+    return get_job_service(
+        db,
+        getattr(state, "image_analyzer", None) or get_image_analyzer(),
+        getattr(state, "job_parser", None) or get_job_parser(),
+        getattr(state, "pricing_agent", None) or get_pricing_agent()
+    )
+
+
 @router.post("/create", response_model=List[JobResponse], status_code=status.HTTP_201_CREATED)
 async def create_job(
     location_id: int = Form(...),
     description: str = Form(...),
     user_id: int = Form(...),  # In production, extract from JWT token
     images: Optional[List[UploadFile]] = File(None),
-    db: AsyncSession = Depends(get_db)
+    job_service: JobService = Depends(provide_job_service)
 ):
     """
     Create one or more jobs from a text description
@@ -40,22 +58,13 @@ async def create_job(
     """
     try:
         # Save uploaded images (in production, upload to S3)
+        # For MVP, save locally. In production, upload to S3
         image_paths = []
         if images:
-            for i, image in enumerate(images):
-                # For MVP, save locally. In production, upload to S3
-                image_path = f"/tmp/job_image_{user_id}_{i}.jpg"
-                with open(image_path, "wb") as f:
-                    f.write(await image.read())
-                image_paths.append(image_path)
-        
-        # Get AI services
-        image_analyzer = get_image_analyzer()
-        job_parser = get_job_parser()
-        pricing_agent = get_pricing_agent()
-        
-        # Create job service
-        job_service = get_job_service(db, image_analyzer, job_parser, pricing_agent)
+            image_paths = await asyncio.gather(*[
+                save_upload(image, f"/tmp/job_image_{user_id}_{i}.jpg")
+                for i, image in enumerate(images)
+            ])
         
         # Create jobs
         jobs = await job_service.create_job_from_text(
@@ -67,8 +76,14 @@ async def create_job(
         
         # TODO: Broadcast to nearby providers via WebSocket
         
-        return jobs
+        # Encode the whole list in one orjson call instead of validating each JobResponse
+        return ORJSONResponse(
+            [job_to_dict(job) for job in jobs],
+            status_code=status.HTTP_201_CREATED
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error creating job: {e}")
         raise HTTPException(
@@ -80,30 +95,21 @@ async def create_job(
 @router.get("/user/{user_id}", response_model=List[JobResponse])
 async def get_user_jobs(
     user_id: int,
-    db: AsyncSession = Depends(get_db)
+    job_service: JobService = Depends(provide_job_service)
 ):
     """Get all jobs for a user"""
-    image_analyzer = get_image_analyzer()
-    job_parser = get_job_parser()
-    pricing_agent = get_pricing_agent()
-    
-    job_service = get_job_service(db, image_analyzer, job_parser, pricing_agent)
     jobs = await job_service.get_user_jobs(user_id)
     
-    return jobs
+    # Returning a Response skips response_model validation; the model still documents the shape
+    return ORJSONResponse([job_to_dict(job) for job in jobs])
 
 
 @router.get("/{job_id}", response_model=JobResponse)
 async def get_job(
     job_id: int,
-    db: AsyncSession = Depends(get_db)
+    job_service: JobService = Depends(provide_job_service)
 ):
     """Get a specific job by ID"""
-    image_analyzer = get_image_analyzer()
-    job_parser = get_job_parser()
-    pricing_agent = get_pricing_agent()
-    
-    job_service = get_job_service(db, image_analyzer, job_parser, pricing_agent)
     job = await job_service.get_job_by_id(job_id)
     
     if not job:
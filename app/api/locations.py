@@ -9,9 +9,26 @@ from typing import List
 from app.database import get_db
 from app.models.location import Location
 from app.schemas.location import LocationCreate, LocationResponse
+from app.utils.orjson_response import ORJSONResponse
+from app.utils.serializers import location_to_dict
 
 router = APIRouter()
 
+# Built once at import; the route only binds parameters
+_CREATE_LOCATION_SQL = text("""
+    INSERT INTO locations (
+        user_id, address_line1, address_line2, city, state, zip_code, country,
+        coordinates, is_primary, nickname, created_at
+    )
+    VALUES (
+        :user_id, :address_line1, :address_line2, :city, :state, :zip_code, :country,
+        ST_SetSRID(ST_MakePoint(:lon, :lat), 4326),
+        :is_primary, :nickname, NOW()
+    )
+    RETURNING id, user_id, address_line1, address_line2, city, state, zip_code,
+        country, is_primary, nickname, created_at
+""")
+
 
 @router.post("/create", response_model=LocationResponse, status_code=status.HTTP_201_CREATED)
 async def create_location(
@@ -22,21 +39,8 @@ async def create_location(
     # Extract user_id from location_data instead of separate parameter
     user_id = location_data.user_id
     # Create location with PostGIS point
-    create_query = text("""
-        INSERT INTO locations (
-            user_id, address_line1, address_line2, city, state, zip_code, country,
-            coordinates, is_primary, nickname, created_at
-        )
-        VALUES (
-            :user_id, :address_line1, :address_line2, :city, :state, :zip_code, :country,
-            ST_SetSRID(ST_MakePoint(:lon, :lat), 4326),
-            :is_primary, :nickname, NOW()
-        )
-        RETURNING id
-    """)
-    
     result = await db.execute(
-        create_query,
+        _CREATE_LOCATION_SQL,
         {
             "user_id": user_id,
             "address_line1": location_data.address_line1,
@@ -52,12 +56,10 @@ async def create_location(
         }
     )
     
-    location_id = result.scalar_one()
+    # RETURNING carries every response field, so no follow-up SELECT is needed
+    location = LocationResponse(**result.mappings().one())
     await db.commit()
     
-    # Fetch the created location
-    location = await db.get(Location, location_id)
-    
     return location
 
 
@@ -71,7 +73,8 @@ async def get_user_locations(
     result = await db.execute(query)
     locations = result.scalars().all()
     
-    return list(locations)
+    # Returning a Response skips response_model validation; the model still documents the shape
+    return ORJSONResponse([location_to_dict(location) for location in locations])
 
 
 @router.get("/{location_id}", response_model=LocationResponse)
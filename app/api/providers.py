@@ -1,24 +1,65 @@
 """
 Provider Routes - Provider-specific functionality
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text
 from typing import List
 import logging
+import msgspec
 
 from app.database import get_db
 from app.models.provider import Provider, ProviderVerification
-from app.schemas.provider import ProviderLocationUpdate, ProviderAvailabilityUpdate
 from app.schemas.job import JobCardResponse
+from app.schemas.provider import ProviderLocationUpdate, ProviderAvailabilityUpdate
 from app.services.matching_service import get_matching_service
 from app.ai import get_ocr_processor
+from app.utils.uploads import save_upload
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+_card_encoder = msgspec.json.Encoder()
+
+
+def _inline_schema(schema: dict) -> dict:
+    """Resolve msgspec's local $defs refs so the schema stands alone in OpenAPI"""
+    defs = schema.pop("$defs", {})
+    
+    def resolve(node):
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if ref is not None:
+                return resolve(defs[ref.rsplit("/", 1)[-1]])
+            return {key: resolve(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [resolve(value) for value in node]
+        return node
+    
+    return resolve(schema)
+
+
+# The feed returns raw bytes, so document its shape explicitly
+_NEARBY_JOBS_RESPONSES = {
+    200: {
+        "description": "Job cards sorted by distance",
+        "content": {
+            "application/json": {
+                "schema": _inline_schema(msgspec.json.schema(List[JobCardResponse]))
+            }
+        }
+    }
+}
+
+# Built once at import; the route only binds parameters
+_UPDATE_PROVIDER_LOC_SQL = text("""
+    UPDATE providers
+    SET current_location = ST_SetSRID(ST_MakePoint(:lon, :lat), 4326)
+    WHERE id = :provider_id
+""")
+
 
-@router.get("/nearby-jobs/{provider_id}", response_model=List[JobCardResponse])
+@router.get("/nearby-jobs/{provider_id}", response_class=Response, responses=_NEARBY_JOBS_RESPONSES)
 async def get_nearby_jobs(
     provider_id: int,
     latitude: float,
@@ -46,7 +87,8 @@ async def get_nearby_jobs(
         limit=limit
     )
     
-    return job_cards
+    # Encode the card structs in one msgspec call, bypassing FastAPI's encoder
+    return Response(content=_card_encoder.encode(job_cards), media_type="application/json")
 
 
 @router.post("/{provider_id}/location", status_code=status.HTTP_200_OK)
@@ -65,14 +107,8 @@ async def update_provider_location(
         )
     
     # Update location using raw SQL (PostGIS)
-    update_query = text("""
-        UPDATE providers
-        SET current_location = ST_SetSRID(ST_MakePoint(:lon, :lat), 4326)
-        WHERE id = :provider_id
-    """)
-    
     await db.execute(
-        update_query,
+        _UPDATE_PROVIDER_LOC_SQL,
         {
             "lon": location.longitude,
             "lat": location.latitude,
@@ -132,8 +168,7 @@ async def upload_verification_document(
         
         # Save document (in production, upload to S3)
         document_path = f"/tmp/verification_{provider_id}_{document_type}.jpg"
-        with open(document_path, "wb") as f:
-            f.write(await document.read())
+        await save_upload(document, document_path)
         
         # Process with OCR
         ocr_processor = get_ocr_processor()
@@ -161,6 +196,8 @@ async def upload_verification_document(
             "extracted_data": extracted_data
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading verification: {e}")
         raise HTTPException(
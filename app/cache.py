@@ -0,0 +1,43 @@
+"""
+Shared Redis client
+
+Redis is optional: without the redis package or REDIS_URL, get_redis()
+returns None and callers fall back to the database.
+"""
+import logging
+from typing import Optional
+
+from app.config import settings
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_redis = None
+
+
+def get_redis() -> Optional["aioredis.Redis"]:
+    """Get or create the Redis client singleton (None if Redis isn't configured)"""
+    global _redis
+    if not REDIS_AVAILABLE or not settings.REDIS_URL:
+        return None
+    if _redis is None:
+        # Short timeouts: Redis only fronts the database, so a slow Redis must not stall requests
+        _redis = aioredis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5
+        )
+    return _redis
+
+
+async def close_redis():
+    """Close the Redis connection pool"""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
@@ -2,13 +2,16 @@
 HandyMan - Gig Economy Platform for Home Services
 FastAPI Main Application
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 
 from app.config import settings
 from app.database import init_db
 from app.api import api_router
+from app.ai import get_image_analyzer, get_job_parser, get_pricing_agent
+from app.cache import close_redis
+from app.utils.orjson_response import ORJSONResponse
 
 # Configure logging
 logging.basicConfig(
@@ -24,16 +27,40 @@ app = FastAPI(
     description="Gig Economy Platform for On-Demand Home Services",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
+
+# Registered before CORS so CORS stays outermost and 413s still carry CORS headers
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """
+    Reject bodies that declare an oversized Content-Length before any handler reads them
+    
+    Chunked uploads carry no length; save_upload enforces the cap per file as it reads.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.MAX_UPLOAD_BYTES:
+        return ORJSONResponse(
+            status_code=413,
+            content={"detail": "Payload too large"}
+        )
+    return await call_next(request)
+
+
 # CORS middleware
+cors_origins = [origin.strip() for origin in settings.CORS_ORIGINS.split(",") if origin.strip()]
+if "*" in cors_origins:
+    # With credentials allowed, a wildcard lets any site make authenticated requests
+    logger.warning("CORS_ORIGINS contains '*' while credentials are allowed; list explicit origins")
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, specify allowed origins
+    allow_origins=cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=86400,  # Let browsers cache preflight responses for a day
 )
 
 
@@ -43,6 +70,11 @@ async def startup_event():
     logger.info("Starting HandyMan API...")
     logger.info(f"Environment: {settings.APP_ENV}")
     
+    # Build AI services once; routes reuse them via app.state
+    app.state.image_analyzer = get_image_analyzer()
+    app.state.job_parser = get_job_parser()
+    app.state.pricing_agent = get_pricing_agent()
+    
     # Initialize database tables
     if settings.DEBUG:
         await init_db()
@@ -53,6 +85,11 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down HandyMan API...")
+    
+    # Release pooled outbound connections
+    await get_job_parser().aclose()
+    await get_pricing_agent().aclose()
+    await close_redis()
 
 
 @app.get("/")
@@ -81,5 +118,7 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=settings.DEBUG
+        reload=settings.DEBUG,
+        loop="uvloop",
+        http="httptools"
     )
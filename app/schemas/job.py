@@ -1,3 +1,4 @@
+import msgspec
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
@@ -47,8 +48,14 @@ class JobResponse(BaseModel):
         from_attributes = True
 
 
-class JobCardResponse(BaseModel):
-    """Simplified job card for provider's Tinder-style feed"""
+class JobCardResponse(msgspec.Struct, gc=False):
+    """
+    Simplified job card for provider's Tinder-style feed
+    
+    A msgspec Struct rather than a Pydantic model: cards are built from
+    trusted query rows and encoded straight to JSON, so validation on
+    the response path is pure overhead.
+    """
     id: int
     title: str
     job_type: JobType
@@ -60,9 +67,6 @@ class JobCardResponse(BaseModel):
     location_city: str
     location_state: str
     image_url: Optional[str]  # First image if available
-    
-    class Config:
-        from_attributes = True
 
 
 class JobAcceptRequest(BaseModel):
@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
 
 from app.config import settings
 
@@ -26,6 +27,16 @@ class AuthService:
         """Hash a password"""
         return pwd_context.hash(password)
     
+    @staticmethod
+    async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+        """Verify a password in a worker thread so hashing doesn't block the event loop"""
+        return await run_in_threadpool(pwd_context.verify, plain_password, hashed_password)
+    
+    @staticmethod
+    async def get_password_hash_async(password: str) -> str:
+        """Hash a password in a worker thread so hashing doesn't block the event loop"""
+        return await run_in_threadpool(pwd_context.hash, password)
+    
     @staticmethod
     def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
         """Create a JWT access token"""
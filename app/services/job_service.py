@@ -3,12 +3,13 @@ Job Service - Handles job creation with AI integration
 """
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text
+from sqlalchemy.orm import selectinload
 from datetime import datetime, timedelta
 from typing import List, Optional
+import asyncio
 import logging
 
-from app.models.job import Job, JobImage, JobStatus
-from app.models.location import Location
+from app.models.job import Job, JobImage, JobStatus, JobType
 from app.schemas.job import JobCreate, JobImageAnalysis
 from app.ai import ImageAnalyzer, JobParser, DynamicPricingAgent
 from app.services.matching_service import MatchingService
@@ -16,6 +17,13 @@ from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# One round trip both checks the location exists and extracts its coordinates
+_LOCATION_COORDS_SQL = text("""
+    SELECT ST_X(coordinates::geometry) as lon, ST_Y(coordinates::geometry) as lat
+    FROM locations
+    WHERE id = :location_id
+""")
+
 
 class JobService:
     """
@@ -58,23 +66,17 @@ class JobService:
             # Parse description with LLM
             parsed_jobs = await self.job_parser.parse_job_request(description)
             
-            # Get location for pricing
-            location = await self.db.get(Location, location_id)
-            if not location:
-                raise ValueError(f"Location {location_id} not found")
-            
-            # Extract coordinates
-            coord_query = text("""
-                SELECT ST_X(coordinates::geometry) as lon, ST_Y(coordinates::geometry) as lat
-                FROM locations
-                WHERE id = :location_id
-            """)
-            coord_result = await self.db.execute(coord_query, {"location_id": location_id})
-            coords = coord_result.one()
+            # Get location coordinates for pricing
+            coords = await self._get_location_coords(location_id)
             
-            created_jobs = []
+            # One query gives the nearby provider count for every job type
+            matching_service = MatchingService(self.db)
+            provider_counts = await matching_service.count_providers_by_job_type(
+                latitude=coords.lat,
+                longitude=coords.lon
+            )
             
-            for parsed_job in parsed_jobs:
+            async def analyze_and_price(parsed_job):
                 # Process images if provided
                 cv_analysis = None
                 if image_paths:
@@ -84,9 +86,7 @@ class JobService:
                     )
                 
                 # Get number of available providers for pricing
-                matching_service = MatchingService(self.db)
-                # We'll estimate provider count as 10 for now since job doesn't exist yet
-                provider_count = 10
+                provider_count = provider_counts.get(JobType(parsed_job["job_type"]).value, 0)
                 
                 # Calculate pricing
                 pricing = await self.pricing_agent.calculate_price(
@@ -97,7 +97,15 @@ class JobService:
                     longitude=coords.lon,
                     provider_count=provider_count
                 )
-                
+                return cv_analysis, pricing
+            
+            # Parsed jobs are independent, so overlap their CV and pricing (weather) work
+            analyses = await asyncio.gather(*[analyze_and_price(pj) for pj in parsed_jobs])
+            
+            created_jobs = []
+            now = datetime.utcnow()
+            
+            for parsed_job, (cv_analysis, pricing) in zip(parsed_jobs, analyses):
                 # Create job
                 job = Job(
                     user_id=user_id,
@@ -112,7 +120,7 @@ class JobService:
                     surge_multiplier=pricing["demand_multiplier"],
                     final_price=pricing["final_price"],
                     status=JobStatus.PENDING,
-                    expires_at=datetime.utcnow() + timedelta(minutes=settings.JOB_EXPIRY_MINUTES),
+                    expires_at=now + timedelta(minutes=settings.JOB_EXPIRY_MINUTES),
                     extra_data={
                         "weather_multiplier": pricing["weather_multiplier"],
                         "severity_multiplier": pricing["severity_multiplier"]
@@ -120,10 +128,13 @@ class JobService:
                 )
                 
                 self.db.add(job)
-                await self.db.flush()  # Get job ID
-                
-                # Add images
-                if image_paths:
+                created_jobs.append(job)
+            
+            await self.db.flush()  # Get job IDs for all jobs in one round trip
+            
+            # Add images
+            if image_paths:
+                for job, (cv_analysis, _) in zip(created_jobs, analyses):
                     for img_path in image_paths:
                         job_image = JobImage(
                             job_id=job.id,
@@ -131,14 +142,20 @@ class JobService:
                             analysis_results=cv_analysis
                         )
                         self.db.add(job_image)
-                
-                created_jobs.append(job)
             
             await self.db.commit()
             
-            # Refresh to load relationships
-            for job in created_jobs:
-                await self.db.refresh(job)
+            # Re-select in one query (plus one for images) instead of refreshing each job:
+            # images were added by job_id, so job.images and server defaults such as
+            # created_at and uploaded_at aren't loaded on the instances we hold
+            result = await self.db.execute(
+                select(Job)
+                .where(Job.id.in_([job.id for job in created_jobs]))
+                .options(selectinload(Job.images))
+                .order_by(Job.id)
+                .execution_options(populate_existing=True)
+            )
+            created_jobs = list(result.scalars().all())
             
             logger.info(f"Created {len(created_jobs)} jobs from description")
             return created_jobs
@@ -172,7 +189,6 @@ class JobService:
             Created Job object
         """
         try:
-            from app.models.job import JobType
             job_type_enum = JobType(job_type)
             
             # Analyze first image
@@ -182,18 +198,15 @@ class JobService:
             )
             
             # Get location coordinates
-            location = await self.db.get(Location, location_id)
-            coord_query = text("""
-                SELECT ST_X(coordinates::geometry) as lon, ST_Y(coordinates::geometry) as lat
-                FROM locations
-                WHERE id = :location_id
-            """)
-            coord_result = await self.db.execute(coord_query, {"location_id": location_id})
-            coords = coord_result.one()
+            coords = await self._get_location_coords(location_id)
             
             # Count available providers
             matching_service = MatchingService(self.db)
-            provider_count = 10  # Placeholder
+            provider_counts = await matching_service.count_providers_by_job_type(
+                latitude=coords.lat,
+                longitude=coords.lon
+            )
+            provider_count = provider_counts.get(job_type_enum.value, 0)
             
             # Calculate pricing
             pricing = await self.pricing_agent.calculate_price(
@@ -253,6 +266,14 @@ class JobService:
             await self.db.rollback()
             raise
     
+    async def _get_location_coords(self, location_id: int):
+        """Fetch (lon, lat) for a location, raising ValueError if it doesn't exist"""
+        result = await self.db.execute(_LOCATION_COORDS_SQL, {"location_id": location_id})
+        coords = result.one_or_none()
+        if coords is None:
+            raise ValueError(f"Location {location_id} not found")
+        return coords
+    
     async def get_user_jobs(self, user_id: int) -> List[Job]:
         """Get all jobs for a user"""
         query = select(Job).where(Job.user_id == user_id).order_by(Job.created_at.desc())
@@ -2,22 +2,133 @@
 Matching Service - The "Tinder Mechanic"
 Handles geospatial queries and job-provider matching
 """
-from sqlalchemy import select, and_, func, text
+from sqlalchemy import select, update, and_, func, text, lambda_stmt
 from sqlalchemy.ext.asyncio import AsyncSession
+from geoalchemy2 import Geometry
 from geoalchemy2.functions import ST_DWithin, ST_Distance, ST_SetSRID, ST_MakePoint
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional
 from datetime import datetime, timedelta
 import logging
 
-from app.models.job import Job, JobStatus, JobAssignment
+from app.models.job import Job, JobImage, JobStatus, JobAssignment
 from app.models.provider import Provider, ProviderStatus
 from app.models.location import Location
 from app.schemas.job import JobCardResponse
+from app.cache import get_redis
 from app.config import settings
+from app.utils.geo import haversine_km
 
 logger = logging.getLogger(__name__)
 
 
+# First image per job, fetched in the feed statement instead of lazy-loading job.images
+_FIRST_IMAGE_URL = (
+    select(JobImage.image_url)
+    .where(JobImage.job_id == Job.id)
+    .order_by(JobImage.id)
+    .limit(1)
+    .correlate(Job)
+    .scalar_subquery()
+    .label("image_url")
+)
+
+
+def geog_point(longitude, latitude):
+    """WGS84 point cast to the geography type of the location columns"""
+    return func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326).cast(
+        type_=Location.coordinates.type
+    )
+
+
+def _radius_m(radius_km: Optional[float]) -> float:
+    """Search radius in meters, defaulting to DEFAULT_SEARCH_RADIUS_M"""
+    return radius_km * 1000 if radius_km else settings.DEFAULT_SEARCH_RADIUS_M
+
+
+def _nearby_jobs_query(longitude, latitude, radius_m, job_types, now, limit):
+    """
+    Pending, unexpired jobs of the given types within radius_m, nearest first
+    
+    Returns each job location's lon/lat rather than ST_Distance; the
+    displayed distance is computed for all rows at once in Python.
+    Only the columns a JobCardResponse needs are selected, so wide columns
+    such as description and extra_data JSONB never leave the database.
+    """
+    provider_geog = geog_point(longitude, latitude)
+    location_geom = Location.coordinates.cast(Geometry(geometry_type="POINT", srid=4326))
+    return (
+        select(
+            Job.id,
+            Job.title,
+            Job.job_type,
+            Job.final_price,
+            Job.severity,
+            Job.estimated_square_footage,
+            Job.expires_at,
+            Location.city,
+            Location.state,
+            func.ST_X(location_geom).label("lon"),
+            func.ST_Y(location_geom).label("lat"),
+            _FIRST_IMAGE_URL
+        )
+        .join(Location, Job.location_id == Location.id)
+        .where(
+            and_(
+                Job.status == JobStatus.PENDING,
+                Job.expires_at > now,
+                Job.job_type.in_(job_types),  # Match provider's skills
+                func.ST_DWithin(Location.coordinates, provider_geog, radius_m)
+            )
+        )
+        # KNN operator walks the GiST index (idx_locations_coordinates) in distance
+        # order and stops at LIMIT, instead of sorting every row in the radius
+        .order_by(Location.coordinates.op("<->")(provider_geog))
+        .limit(limit)
+    )
+
+
+def _providers_near_job_query(column, job_id, radius_m):
+    """
+    Select `column` for available, verified providers within radius_m of
+    a job's location whose skills include the job's type
+    
+    The job's geography is compared directly with ST_DWithin, so the
+    lookup, coordinate extraction and provider search are one statement.
+    """
+    return (
+        select(column)
+        .select_from(Provider)
+        .join(Job, Job.id == job_id)
+        .join(Location, Location.id == Job.location_id)
+        .where(
+            and_(
+                Provider.is_available == True,
+                Provider.status == ProviderStatus.VERIFIED,
+                Provider.current_location.isnot(None),
+                Provider.job_types.op("?")(Job.job_type),  # JSONB array contains job type
+                func.ST_DWithin(Provider.current_location, Location.coordinates, radius_m)
+            )
+        )
+    )
+
+
+# Available providers near a point, counted per skill in one pass
+_PROVIDER_COUNTS_BY_JOB_TYPE_SQL = text("""
+    SELECT skill.job_type, COUNT(*) AS provider_count
+    FROM providers
+    CROSS JOIN LATERAL jsonb_array_elements_text(providers.job_types) AS skill(job_type)
+    WHERE providers.is_available = TRUE
+      AND providers.status = 'verified'
+      AND providers.current_location IS NOT NULL
+      AND ST_DWithin(
+          providers.current_location,
+          ST_SetSRID(ST_MakePoint(:lon, :lat), 4326)::geography,
+          :radius_m
+      )
+    GROUP BY skill.job_type
+""")
+
+
 class MatchingService:
     """
     Service for matching jobs with nearby providers using PostGIS
@@ -25,7 +136,7 @@ class MatchingService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.default_radius_m = settings.DEFAULT_SEARCH_RADIUS_KM * 1000  # Convert to meters
+        self.default_radius_m = settings.DEFAULT_SEARCH_RADIUS_M
     
     async def get_nearby_jobs_for_provider(
         self,
@@ -54,67 +165,46 @@ class MatchingService:
             if not provider:
                 return []
             
-            radius_m = (radius_km or settings.DEFAULT_SEARCH_RADIUS_KM) * 1000
+            radius_m = _radius_m(radius_km)
             
-            # Create point from provider's location
-            provider_point = func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326)
-            
-            # Build query for nearby pending jobs
-            query = (
-                select(
-                    Job,
-                    Location,
-                    (func.ST_Distance(
-                        Location.coordinates,
-                        provider_point.cast(type_=Location.coordinates.type)
-                    ) / 1000).label("distance_km")
-                )
-                .join(Location, Job.location_id == Location.id)
-                .where(
-                    and_(
-                        Job.status == JobStatus.PENDING,
-                        Job.expires_at > datetime.utcnow(),
-                        Job.job_type.in_(provider.job_types),  # Match provider's skills
-                        func.ST_DWithin(
-                            Location.coordinates,
-                            provider_point.cast(type_=Location.coordinates.type),
-                            radius_m
-                        )
-                    )
-                )
-                .order_by(text("distance_km"))
-                .limit(limit)
+            # Statement is compiled once and cached; these values bind as parameters
+            job_types = list(provider.job_types)
+            now = datetime.utcnow()
+            query = lambda_stmt(
+                lambda: _nearby_jobs_query(longitude, latitude, radius_m, job_types, now, limit)
             )
             
             result = await self.db.execute(query)
             rows = result.all()
             
-            # Convert to JobCardResponse
+            # Displayed distances for every card in one vectorized pass
+            distances_km = haversine_km(
+                latitude, longitude, [row.lat for row in rows], [row.lon for row in rows]
+            ).tolist()
+            
+            # Build JobCardResponse positionally (field order) straight from the row tuples
             job_cards = []
-            for job, location, distance_km in rows:
-                # Calculate time until expiry
-                time_until_expiry = job.expires_at - datetime.utcnow()
-                expires_in_minutes = int(time_until_expiry.total_seconds() / 60)
+            for row, distance_km in zip(rows, distances_km):
+                (job_id, title, job_type, final_price, severity, square_footage,
+                 expires_at, city, state, _, _, image_url) = row
                 
-                # Get first image URL if available
-                image_url = None
-                if job.images:
-                    image_url = job.images[0].image_url
+                # Calculate time until expiry against the same "now" the query filtered on
+                expires_in_minutes = int((expires_at - now).total_seconds() // 60)
                 
-                job_card = JobCardResponse(
-                    id=job.id,
-                    title=job.title,
-                    job_type=job.job_type,
-                    final_price=job.final_price,
-                    distance_km=round(distance_km, 2),
-                    expires_in_minutes=max(0, expires_in_minutes),
-                    severity=job.severity,
-                    estimated_square_footage=job.estimated_square_footage,
-                    location_city=location.city,
-                    location_state=location.state,
-                    image_url=image_url
-                )
-                job_cards.append(job_card)
+                # DECIMAL columns arrive as Decimal, which msgspec would encode as strings
+                job_cards.append(JobCardResponse(
+                    job_id,
+                    title,
+                    job_type,
+                    float(final_price),
+                    round(distance_km, 2),
+                    max(0, expires_in_minutes),
+                    severity,
+                    float(square_footage) if square_footage is not None else None,
+                    city,
+                    state,
+                    image_url
+                ))
             
             logger.info(f"Found {len(job_cards)} nearby jobs for provider {provider_id}")
             return job_cards
@@ -130,7 +220,8 @@ class MatchingService:
     ) -> bool:
         """
         Provider accepts a job (swipe right) - First-to-claim logic
-        Uses atomic transaction to ensure only one provider gets the job
+        A conditional UPDATE claims the job atomically, so concurrent
+        providers never queue on a row lock; only the winner inserts
         
         Args:
             job_id: Job ID
@@ -139,26 +230,28 @@ class MatchingService:
         Returns:
             True if successfully accepted, False if job already taken or not available
         """
+        # Cheap first-claim arbitration in Redis; only the winner touches Postgres
+        if not await self._acquire_claim(job_id, provider_id):
+            logger.warning(f"Job {job_id} already claimed")
+            return False
+        
         try:
-            # Get job with row-level lock (FOR UPDATE)
-            query = select(Job).where(Job.id == job_id).with_for_update()
-            result = await self.db.execute(query)
-            job = result.scalar_one_or_none()
-            
-            if not job:
-                logger.warning(f"Job {job_id} not found")
-                return False
-            
-            # Check if job is still available
-            if job.status != JobStatus.PENDING:
-                logger.warning(f"Job {job_id} already assigned or not pending")
-                return False
-            
-            # Check if not expired
-            if job.expires_at <= datetime.utcnow():
-                logger.warning(f"Job {job_id} has expired")
-                job.status = JobStatus.EXPIRED
-                await self.db.commit()
+            # Claim the job only if it is still pending and unexpired
+            claim = (
+                update(Job)
+                .where(
+                    Job.id == job_id,
+                    Job.status == JobStatus.PENDING,
+                    Job.expires_at > func.now()
+                )
+                .values(status=JobStatus.ASSIGNED)
+                .returning(Job.id)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.db.execute(claim)
+            if result.scalar_one_or_none() is None:
+                logger.warning(f"Job {job_id} not found, already assigned, or expired")
+                await self._release_claim(job_id)
                 return False
             
             # Create assignment
@@ -168,9 +261,6 @@ class MatchingService:
                 accepted_at=datetime.utcnow()
             )
             
-            # Update job status
-            job.status = JobStatus.ASSIGNED
-            
             self.db.add(assignment)
             await self.db.commit()
             
@@ -180,8 +270,35 @@ class MatchingService:
         except Exception as e:
             logger.error(f"Error accepting job: {e}")
             await self.db.rollback()
+            await self._release_claim(job_id)
             return False
     
+    async def _acquire_claim(self, job_id: int, provider_id: int) -> bool:
+        """SET NX a short-lived claim key; fails open to database arbitration"""
+        redis = get_redis()
+        if redis is None:
+            return True
+        try:
+            return bool(await redis.set(
+                f"job:{job_id}:claim",
+                provider_id,
+                nx=True,
+                ex=settings.JOB_CLAIM_TTL_SECONDS
+            ))
+        except Exception as e:
+            logger.warning(f"Redis claim unavailable, falling back to database: {e}")
+            return True
+    
+    async def _release_claim(self, job_id: int):
+        """Drop a claim whose database write failed so others can retry"""
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.delete(f"job:{job_id}:claim")
+        except Exception as e:
+            logger.warning(f"Could not release claim for job {job_id}: {e}")
+    
     async def find_available_providers(
         self,
         job_id: int,
@@ -199,45 +316,9 @@ class MatchingService:
             Count of available providers
         """
         try:
-            # Get job location
-            query = select(Job, Location).join(Location).where(Job.id == job_id)
-            result = await self.db.execute(query)
-            row = result.one_or_none()
-            
-            if not row:
-                return 0
-            
-            job, location = row
-            
-            # Extract coordinates from location
-            # Note: This requires raw SQL to extract lat/lon from Geography type
-            coord_query = text("""
-                SELECT ST_X(coordinates::geometry) as lon, ST_Y(coordinates::geometry) as lat
-                FROM locations
-                WHERE id = :location_id
-            """)
-            coord_result = await self.db.execute(coord_query, {"location_id": location.id})
-            coords = coord_result.one()
-            
-            radius_m = (radius_km or settings.DEFAULT_SEARCH_RADIUS_KM) * 1000
-            point = func.ST_SetSRID(func.ST_MakePoint(coords.lon, coords.lat), 4326)
-            
-            # Count available providers
-            query = (
-                select(func.count(Provider.id))
-                .where(
-                    and_(
-                        Provider.is_available == True,
-                        Provider.status == ProviderStatus.VERIFIED,
-                        Provider.current_location.isnot(None),
-                        job.job_type.in_(Provider.job_types),
-                        func.ST_DWithin(
-                            Provider.current_location,
-                            point.cast(type_=Provider.current_location.type),
-                            radius_m
-                        )
-                    )
-                )
+            radius_m = _radius_m(radius_km)
+            query = lambda_stmt(
+                lambda: _providers_near_job_query(func.count(Provider.id), job_id, radius_m)
             )
             
             result = await self.db.execute(query)
@@ -249,69 +330,63 @@ class MatchingService:
             logger.error(f"Error counting providers: {e}")
             return 0
     
+    async def count_providers_by_job_type(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: Optional[float] = None
+    ) -> Dict[str, int]:
+        """
+        Count available providers near a point for every job type at once
+        Used for surge pricing before the job exists
+        
+        Returns:
+            Mapping of job type value to provider count (missing types have none)
+        
+        Database errors propagate: an empty mapping would read as zero supply
+        and price every job at maximum surge.
+        """
+        radius_m = _radius_m(radius_km)
+        result = await self.db.execute(
+            _PROVIDER_COUNTS_BY_JOB_TYPE_SQL,
+            {"lon": longitude, "lat": latitude, "radius_m": radius_m}
+        )
+        return {row.job_type: row.provider_count for row in result}
+    
     async def broadcast_job_to_providers(
         self,
         job_id: int
-    ) -> List[int]:
+    ) -> AsyncIterator[int]:
         """
-        Get list of provider IDs to broadcast job notification to
+        Stream the IDs of providers to broadcast a job notification to
+        
+        Rows come from a server-side cursor in batches, so notifications can
+        go out while the rest of a dense metro's providers are still being
+        read, without holding them all in memory.
         
         Args:
             job_id: Job ID
             
-        Returns:
-            List of provider IDs
+        Yields:
+            Provider IDs
         """
+        count = 0
         try:
-            # Get job and location
-            query = select(Job, Location).join(Location).where(Job.id == job_id)
-            result = await self.db.execute(query)
-            row = result.one_or_none()
-            
-            if not row:
-                return []
-            
-            job, location = row
+            radius_m = self.default_radius_m
+            query = lambda_stmt(lambda: _providers_near_job_query(Provider.id, job_id, radius_m))
             
-            # Get location coordinates
-            coord_query = text("""
-                SELECT ST_X(coordinates::geometry) as lon, ST_Y(coordinates::geometry) as lat
-                FROM locations
-                WHERE id = :location_id
-            """)
-            coord_result = await self.db.execute(coord_query, {"location_id": location.id})
-            coords = coord_result.one()
-            
-            point = func.ST_SetSRID(func.ST_MakePoint(coords.lon, coords.lat), 4326)
-            radius_m = settings.DEFAULT_SEARCH_RADIUS_KM * 1000
-            
-            # Find matching providers
-            query = (
-                select(Provider.id)
-                .where(
-                    and_(
-                        Provider.is_available == True,
-                        Provider.status == ProviderStatus.VERIFIED,
-                        Provider.current_location.isnot(None),
-                        job.job_type.in_(Provider.job_types),
-                        func.ST_DWithin(
-                            Provider.current_location,
-                            point.cast(type_=Provider.current_location.type),
-                            radius_m
-                        )
-                    )
-                )
+            provider_ids = await self.db.stream_scalars(
+                query,
+                execution_options={"yield_per": 200}
             )
-            
-            result = await self.db.execute(query)
-            provider_ids = [row[0] for row in result.all()]
-            
-            logger.info(f"Broadcasting job {job_id} to {len(provider_ids)} providers")
-            return provider_ids
+            async for provider_id in provider_ids:
+                count += 1
+                yield provider_id
             
         except Exception as e:
             logger.error(f"Error broadcasting job: {e}")
-            return []
+        
+        logger.info(f"Broadcast job {job_id} to {count} providers")
 
 
 def get_matching_service(db: AsyncSession) -> MatchingService:
@@ -0,0 +1,21 @@
+"""
+Geospatial helpers
+"""
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088  # Mean Earth radius (IUGG)
+
+
+def haversine_km(lat: float, lon: float, lats, lons) -> np.ndarray:
+    """
+    Great-circle distance in km from one point to many, vectorized
+    
+    Spherical, so it can differ from PostGIS's spheroidal geography
+    distance by up to ~0.5% - fine for display, not for billing.
+    """
+    lat1 = np.radians(lat)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    dlat = lat2 - lat1
+    dlon = np.radians(np.asarray(lons, dtype=np.float64) - lon)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
@@ -0,0 +1,33 @@
+"""
+orjson-backed JSON response used as the app's default response class
+"""
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def _default(obj: Any) -> Any:
+    """Encode types orjson doesn't know the way FastAPI's encoder would"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return str(obj)
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    Serialize with orjson instead of stdlib json
+    
+    Datetimes keep the same ISO format response_model produced (naive
+    stays naive), NumPy values from the CV pipeline serialize natively,
+    Decimals become numbers and anything else unknown falls back to str().
+    """
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
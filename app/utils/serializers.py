@@ -0,0 +1,45 @@
+"""
+Plain-dict projections of ORM rows for hot read endpoints
+
+Routes return these through ORJSONResponse, skipping the per-field
+Pydantic validation FastAPI runs for response_model. Field lists are
+derived from the response schemas so the two can't drift apart.
+Float fields are converted explicitly, since DECIMAL columns load as
+Decimal and response_model used to coerce them.
+"""
+from typing import Any, Dict, Optional
+
+from app.schemas.job import JobImageResponse, JobResponse
+from app.schemas.location import LocationResponse
+
+
+def _float_fields(model) -> frozenset:
+    """Names of a schema's float / Optional[float] fields"""
+    return frozenset(
+        name for name, field in model.model_fields.items()
+        if field.annotation is float or field.annotation == Optional[float]
+    )
+
+
+JOB_FIELDS = tuple(name for name in JobResponse.model_fields if name != "images")
+JOB_FLOAT_FIELDS = _float_fields(JobResponse)
+JOB_IMAGE_FIELDS = tuple(JobImageResponse.model_fields)
+LOCATION_FIELDS = tuple(LocationResponse.model_fields)
+
+
+def job_to_dict(job) -> Dict[str, Any]:
+    """Project a Job row onto the JobResponse fields"""
+    data = {name: getattr(job, name) for name in JOB_FIELDS}
+    for name in JOB_FLOAT_FIELDS:
+        if data[name] is not None:
+            data[name] = float(data[name])
+    data["images"] = [
+        {name: getattr(image, name) for name in JOB_IMAGE_FIELDS}
+        for image in job.images
+    ]
+    return data
+
+
+def location_to_dict(location) -> Dict[str, Any]:
+    """Project a Location row onto the LocationResponse fields"""
+    return {name: getattr(location, name) for name in LOCATION_FIELDS}
@@ -0,0 +1,42 @@
+"""
+Helpers for persisting uploaded files
+"""
+import aiofiles
+import aiofiles.os
+from fastapi import HTTPException, UploadFile, status
+
+from app.config import settings
+
+UPLOAD_CHUNK_SIZE = 1 << 16  # 64 KiB
+
+
+async def save_upload(upload: UploadFile, path: str) -> str:
+    """
+    Stream an upload to disk without blocking the event loop
+    
+    aiofiles runs open/write in a worker thread, and reading in fixed
+    chunks keeps memory flat regardless of upload size.
+    Returns the path so callers can gather several saves in order.
+    
+    Raises 413 once the file passes MAX_UPLOAD_BYTES. This counts the bytes
+    actually read, so chunked uploads without a Content-Length are capped
+    too; the partial file is removed.
+    """
+    written = 0
+    try:
+        async with aiofiles.open(path, "wb") as f:
+            while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+                written += len(chunk)
+                if written > settings.MAX_UPLOAD_BYTES:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="File too large"
+                    )
+                await f.write(chunk)
+    except BaseException:
+        try:
+            await aiofiles.os.remove(path)
+        except FileNotFoundError:
+            pass
+        raise
+    return path
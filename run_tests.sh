@@ -7,7 +7,7 @@ pip install -r requirements-test.txt
 
 echo ""
 echo "Running tests..."
-pytest -v
+pytest -v -n auto
 
 echo ""
 echo "Generating coverage report..."
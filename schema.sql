@@ -107,6 +107,8 @@ CREATE INDEX idx_jobs_location ON jobs(location_id);
 CREATE INDEX idx_jobs_type ON jobs(job_type);
 CREATE INDEX idx_jobs_status ON jobs(status);
 CREATE INDEX idx_jobs_created ON jobs(created_at);
+-- Provider feed: only pending jobs are ever matched, so index just those
+CREATE INDEX idx_jobs_pending_feed ON jobs(job_type, expires_at) WHERE status = 'pending';
 
 -- Job Images Table
 CREATE TABLE job_images (
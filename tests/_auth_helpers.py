@@ -0,0 +1,48 @@
+"""
+Direct account creation and JWT minting for tests that aren't about auth
+
+Skips the register/login HTTP round trips; test_auth.py still exercises
+the real flow.
+"""
+from app.models.user import User
+from app.models.provider import Provider
+from app.services.auth_service import AuthService
+
+
+def make_user_token(session, user_data: dict) -> str:
+    """Insert a user row and sign an access token for it"""
+    user = User(
+        email=user_data["email"],
+        phone=user_data.get("phone"),
+        hashed_password=AuthService.get_password_hash(user_data["password"]),
+        full_name=user_data["full_name"]
+    )
+    session.add(user)
+    session.commit()
+    
+    return AuthService.create_access_token(
+        data={"sub": user.email, "user_id": user.id, "user_type": "user"}
+    )
+
+
+def make_provider_token(session, provider_data: dict) -> str:
+    """Insert a provider row and sign an access token for it"""
+    provider = Provider(
+        email=provider_data["email"],
+        phone=provider_data["phone"],
+        hashed_password=AuthService.get_password_hash(provider_data["password"]),
+        full_name=provider_data["full_name"],
+        job_types=provider_data.get("job_types", provider_data.get("services", [])),
+        hourly_rate=provider_data.get("hourly_rate")
+    )
+    session.add(provider)
+    session.commit()
+    
+    return AuthService.create_access_token(
+        data={"sub": provider.email, "user_id": provider.id, "user_type": "provider"}
+    )
+
+
+def bearer(token: str) -> dict:
+    """Authorization headers for a token"""
+    return {"Authorization": f"Bearer {token}"}
@@ -1,55 +1,129 @@
 """
 Pytest configuration and fixtures for HandyMan tests
 """
+import os
+from contextlib import contextmanager
+import orjson
 import pytest
-import asyncio
-from typing import Generator, AsyncGenerator
+from typing import Generator
 from fastapi.testclient import TestClient
-from httpx import AsyncClient
-from sqlalchemy import create_engine
+from passlib.context import CryptContext
+from sqlalchemy import create_engine, delete, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
 from app.database import Base, get_db
+from app.models.job import Job
 from app.config import settings
+from app.services import auth_service
+from tests._auth_helpers import bearer, make_provider_token, make_user_token
 
 # Use in-memory SQLite for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+SQLALCHEMY_DATABASE_URL = "sqlite+pysqlite:///:memory:"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Bound to the worker's engine by the engine fixture
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
 
-@pytest.fixture(scope="function")
-def test_db() -> Generator:
-    """Create a fresh database for each test"""
+@pytest.fixture(scope="session", autouse=True)
+def _fast_password_hash() -> Generator:
+    """
+    Swap the argon2 password context for a plaintext one for the session
+    
+    Argon2 is deliberately slow; tests exercising register/login don't need it.
+    """
+    original = auth_service.pwd_context
+    auth_service.pwd_context = CryptContext(schemes=["plaintext"])
+    yield
+    auth_service.pwd_context = original
+
+
+@pytest.fixture(scope="session")
+def engine():
+    """
+    In-memory database engine for this test process
+    
+    Session scope is per worker under pytest-xdist (`pytest -n auto`), so
+    every worker gets its own private database.
+    """
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+    test_engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        logging_name=f"test-{worker_id}",
+    )
+    
+    @event.listens_for(test_engine, "connect")
+    def _set_pragmas(dbapi_conn, _):
+        # Nothing here needs durability; skip the journal and sync bookkeeping
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA locking_mode=EXCLUSIVE")
+        cursor.close()
+        # pysqlite's own transaction handling never emits BEGIN, so SAVEPOINT
+        # RELEASE would commit for real; take over and BEGIN explicitly
+        dbapi_conn.isolation_level = None
+    
+    @event.listens_for(test_engine, "begin")
+    def _do_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+    
+    TestingSessionLocal.configure(bind=test_engine)
+    yield test_engine
+    test_engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def test_db(engine) -> Generator:
+    """Create the schema once for the whole test session"""
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(scope="session")
+def connection(engine, test_db) -> Generator:
+    """
+    The engine's single connection, checked out once for the session
+    
+    StaticPool hands every checkout the same DBAPI connection anyway, so
+    per-test connect/close only added pool bookkeeping.
+    """
+    conn = engine.connect()
+    yield conn
+    conn.close()
+
+
 @pytest.fixture(scope="function")
-def db_session(test_db) -> Generator:
-    """Get a database session"""
-    connection = engine.connect()
+def db_session(connection) -> Generator:
+    """
+    Get a database session isolated in a transaction that is rolled back
+    
+    The session joins the test's transaction through SAVEPOINTs, so commits
+    by the code under test only release a savepoint and each test sees a
+    clean database without re-running DDL.
+    """
     transaction = connection.begin()
-    session = TestingSessionLocal(bind=connection)
+    session = TestingSessionLocal(bind=connection, join_transaction_mode="create_savepoint")
     
     yield session
     
     session.close()
     transaction.rollback()
-    connection.close()
 
 
 @pytest.fixture(scope="function")
-def client(db_session) -> Generator:
-    """Get a test client with overridden database dependency"""
+def client(session_client, db_session) -> Generator:
+    """
+    Get the session's test client with the database bound to this test
+    
+    Only the get_db override changes per test; app startup and shutdown
+    run once for the whole session.
+    """
     
     def override_get_db():
         try:
@@ -59,39 +133,109 @@ def client(db_session) -> Generator:
     
     app.dependency_overrides[get_db] = override_get_db
     
+    yield session_client
+    
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture(scope="session")
+def session_client(test_db) -> Generator:
+    """Single test client (and app lifespan) shared by the whole session"""
     with TestClient(app) as test_client:
         yield test_client
     
     app.dependency_overrides.clear()
 
 
-@pytest.fixture(scope="function")
-async def async_client(db_session) -> AsyncGenerator:
-    """Get an async test client"""
+@pytest.fixture(scope="session")
+def token_for(test_db):
+    """
+    Access token for a user or provider dict, memoized by email
+    
+    The account is created on first request and committed outside any
+    test's SAVEPOINT, so it lives for the whole session. Use it from
+    session-scoped fixtures: committing while a test's transaction is
+    open on the shared connection would end that transaction.
+    """
+    tokens = {}
+    
+    def _get(account_data: dict, user_type: str = "user") -> str:
+        key = account_data["email"]
+        if key not in tokens:
+            make_token = make_provider_token if user_type == "provider" else make_user_token
+            session = TestingSessionLocal()
+            try:
+                tokens[key] = make_token(session, account_data)
+            finally:
+                session.close()
+        return tokens[key]
+    
+    return _get
+
+
+@pytest.fixture(scope="session")
+def auth_headers(token_for, mock_user_data) -> dict:
+    """
+    Auth headers for a customer shared by the session
+    
+    Uses its own email so tests that register mock_user_data still can.
+    """
+    return bearer(token_for({**mock_user_data, "email": "session-user@example.com"}))
+
+
+@pytest.fixture(scope="session")
+def provider_headers(token_for, mock_provider_data) -> dict:
+    """Auth headers for a provider shared by the session"""
+    return bearer(token_for({**mock_provider_data, "email": "session-provider@example.com"}, "provider"))
+
+
+@contextmanager
+def committing_db() -> Generator:
+    """Route get_db to sessions that commit for real, outside any test's SAVEPOINT"""
     
     def override_get_db():
+        session = TestingSessionLocal()
         try:
-            yield db_session
+            yield session
         finally:
-            pass
+            session.close()
     
+    previous = app.dependency_overrides.get(get_db)
     app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield
+    finally:
+        if previous is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = previous
+
+
+@pytest.fixture(scope="module")
+def seeded_job(session_client, auth_json_headers, mock_job_json) -> Generator:
+    """
+    A job created once per module for read-only tests
     
-    async with AsyncClient(app=app, base_url="http://test") as ac:
-        yield ac
+    Tests that update or delete a job should create their own, so their
+    changes roll back with the test.
+    """
+    with committing_db():
+        response = session_client.post("/api/v1/jobs", content=mock_job_json, headers=auth_json_headers)
+    job = response.json()
     
-    app.dependency_overrides.clear()
+    yield job
+    
+    # There is no delete endpoint; remove the row directly (it was posted without images)
+    if "id" in job:
+        session = TestingSessionLocal()
+        try:
+            session.execute(delete(Job).where(Job.id == job["id"]))
+            session.commit()
+        finally:
+            session.close()
 
 
 @pytest.fixture(scope="session")
-def event_loop():
-    """Create an event loop for async tests"""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
-
-
-@pytest.fixture
 def mock_user_data():
     """Mock user data for testing"""
     return {
@@ -102,7 +246,7 @@ def mock_user_data():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_job_data():
     """Mock job data for testing"""
     return {
@@ -120,7 +264,31 @@ def mock_job_data():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def mock_user_json(mock_user_data) -> bytes:
+    """mock_user_data serialized once for the session"""
+    return orjson.dumps(mock_user_data)
+
+
+@pytest.fixture(scope="session")
+def mock_job_json(mock_job_data) -> bytes:
+    """mock_job_data serialized once for the session"""
+    return orjson.dumps(mock_job_data)
+
+
+@pytest.fixture(scope="session")
+def json_headers() -> dict:
+    """Content-Type for requests posting pre-serialized JSON bytes"""
+    return {"Content-Type": "application/json"}
+
+
+@pytest.fixture(scope="session")
+def auth_json_headers(auth_headers, json_headers) -> dict:
+    """auth_headers plus the JSON Content-Type"""
+    return {**auth_headers, **json_headers}
+
+
+@pytest.fixture(scope="session")
 def mock_provider_data():
     """Mock provider data for testing"""
     return {
@@ -4,10 +4,15 @@ Tests for authentication endpoints
 import pytest
 from fastapi.testclient import TestClient
 
+_DUP_EMAIL = frozenset({400, 409})
+_BAD_PASSWORD = frozenset({400, 422})
+_AUTH_FAIL = frozenset({401, 403})
+_NOT_FOUND_OR_AUTH = frozenset({401, 404})
 
-def test_register_user_success(client: TestClient, mock_user_data):
+
+def test_register_user_success(client: TestClient, mock_user_data, mock_user_json, json_headers):
     """Test successful user registration"""
-    response = client.post("/api/v1/auth/register", json=mock_user_data)
+    response = client.post("/api/v1/auth/register", content=mock_user_json, headers=json_headers)
     assert response.status_code == 201
     data = response.json()
     assert "id" in data
@@ -15,14 +20,14 @@ def test_register_user_success(client: TestClient, mock_user_data):
     assert "password" not in data  # Password should not be returned
 
 
-def test_register_duplicate_email(client: TestClient, mock_user_data):
+def test_register_duplicate_email(client: TestClient, mock_user_json, json_headers):
     """Test that registering with duplicate email fails"""
     # Register first user
-    client.post("/api/v1/auth/register", json=mock_user_data)
+    client.post("/api/v1/auth/register", content=mock_user_json, headers=json_headers)
     
     # Try to register again with same email
-    response = client.post("/api/v1/auth/register", json=mock_user_data)
-    assert response.status_code in [400, 409]
+    response = client.post("/api/v1/auth/register", content=mock_user_json, headers=json_headers)
+    assert response.status_code in _DUP_EMAIL
 
 
 def test_register_invalid_email(client: TestClient, mock_user_data):
@@ -40,13 +45,13 @@ def test_register_weak_password(client: TestClient, mock_user_data):
     weak_data["password"] = "123"
     
     response = client.post("/api/v1/auth/register", json=weak_data)
-    assert response.status_code in [400, 422]
+    assert response.status_code in _BAD_PASSWORD
 
 
-def test_login_success(client: TestClient, mock_user_data):
+def test_login_success(client: TestClient, mock_user_data, mock_user_json, json_headers):
     """Test successful login"""
     # Register user first
-    client.post("/api/v1/auth/register", json=mock_user_data)
+    client.post("/api/v1/auth/register", content=mock_user_json, headers=json_headers)
     
     # Login
     login_data = {
@@ -61,10 +66,10 @@ def test_login_success(client: TestClient, mock_user_data):
     assert data["token_type"] == "bearer"
 
 
-def test_login_wrong_password(client: TestClient, mock_user_data):
+def test_login_wrong_password(client: TestClient, mock_user_data, mock_user_json, json_headers):
     """Test login with wrong password"""
     # Register user first
-    client.post("/api/v1/auth/register", json=mock_user_data)
+    client.post("/api/v1/auth/register", content=mock_user_json, headers=json_headers)
     
     # Try to login with wrong password
     login_data = {
@@ -72,7 +77,7 @@ def test_login_wrong_password(client: TestClient, mock_user_data):
         "password": "WrongPassword123!"
     }
     response = client.post("/api/v1/auth/login", data=login_data)
-    assert response.status_code in [401, 403]
+    assert response.status_code in _AUTH_FAIL
 
 
 def test_login_nonexistent_user(client: TestClient):
@@ -82,13 +87,13 @@ def test_login_nonexistent_user(client: TestClient):
         "password": "SomePassword123!"
     }
     response = client.post("/api/v1/auth/login", data=login_data)
-    assert response.status_code in [401, 404]
+    assert response.status_code in _NOT_FOUND_OR_AUTH
 
 
-def test_get_current_user(client: TestClient, mock_user_data):
+def test_get_current_user(client: TestClient, mock_user_data, mock_user_json, json_headers):
     """Test getting current user information"""
     # Register and login
-    client.post("/api/v1/auth/register", json=mock_user_data)
+    client.post("/api/v1/auth/register", content=mock_user_json, headers=json_headers)
     
     login_data = {
         "username": mock_user_data["email"],
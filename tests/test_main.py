@@ -24,12 +24,14 @@ def test_health_check(client: TestClient):
     assert data["status"] == "healthy"
 
 
+@pytest.mark.slow
 def test_docs_endpoint_accessible(client: TestClient):
     """Test that API docs are accessible"""
     response = client.get("/docs")
     assert response.status_code == 200
 
 
+@pytest.mark.slow
 def test_redoc_endpoint_accessible(client: TestClient):
     """Test that ReDoc is accessible"""
     response = client.get("/redoc")